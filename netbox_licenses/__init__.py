@@ -8,22 +8,36 @@ class LicenseManagementConfig(PluginConfig):
     author = 'Brynjar F. Aune'
     author_email = 'contact@example.com'
     base_url = 'licenses'
+    graphql_schema = 'graphql.schema.schema'
     required_settings = []
 
     # Plugin-specific settings
     default_settings = {
-        'auto_calculate_utilization': True,  # Automatically calculate license utilization
+        'auto_calculate_utilization': False, # Recount consumed_licenses on every instance save/delete
         'alert_threshold_percent': 90,       # Alert when utilization exceeds this percentage
         'show_utilization_badges': True,     # Display utilization status in UI
         'enable_cost_tracking': True,        # Track license costs and renewals
         'renewal_warning_days': 90,          # Days before renewal to show warnings
         'max_instances_per_license': 1000,   # Safety limit for license instances
+        'instrumentation': True,             # Log query counts and timings for plugin views and services
+        'instrumentation_header': False,     # Add X-License-Instrumentation to responses (always on with DEBUG)
+        'query_budgets': {},                 # Max queries per URL name or Service.method, warns when exceeded
     }
 
+    middleware = [
+        'netbox_licenses.instrumentation.InstrumentationMiddleware',
+    ]
+
     # Cache settings for performance
     caching_config = {
         'timeout': 300,  # 5 minutes
         'cache_key': 'netbox_licenses',
     }
 
+    def ready(self):
+        super().ready()
+        # Connects the exchange rate cache, data version and assignment name receivers, and
+        # the consumed_licenses recount (governed by auto_calculate_utilization)
+        from . import signals  # noqa: F401
+
 config = LicenseManagementConfig
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import License, LicenseInstance
+from .models import ExchangeRate, License, LicenseInstance
 
 
 @admin.register(License)
@@ -97,4 +97,11 @@ class LicenseInstanceAdmin(admin.ModelAdmin):
     
     def get_assignment_display(self, obj):
         return obj.get_assignment_display()
-    get_assignment_display.short_description = 'Assigned To'
\ No newline at end of file
+    get_assignment_display.short_description = 'Assigned To'
+
+
+@admin.register(ExchangeRate)
+class ExchangeRateAdmin(admin.ModelAdmin):
+    list_display = ['currency', 'rate_to_nok', 'effective_date', 'last_updated']
+    list_filter = ['currency', 'effective_date']
+    ordering = ['currency', '-effective_date']
@@ -0,0 +1,43 @@
+from netbox.config import get_config
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination over the primary key.
+
+    Each page is an index range scan continuing from the last ID seen, so deep
+    pages cost the same as the first and no total count is computed. Client
+    supplied ?ordering= is ignored to keep the ordering unique and indexed.
+    """
+    ordering = ('id',)
+    page_size_query_param = 'limit'
+
+    def __init__(self):
+        config = get_config()
+        self.page_size = config.PAGINATE_COUNT
+        self.max_page_size = config.MAX_PAGE_SIZE or None
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordering
+
+
+class KeysetPaginationMixin:
+    """
+    Switch a viewset to KeysetPagination when the client asks for it with
+    ?pagination=keyset or is following a cursor returned by a previous page.
+    Offset pagination remains the default.
+    """
+
+    def use_keyset_pagination(self):
+        request = getattr(self, 'request', None)
+        if request is None:
+            return False
+        params = request.query_params
+        return params.get('pagination') == 'keyset' or KeysetPagination.cursor_query_param in params
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator') and self.use_keyset_pagination():
+            self._paginator = KeysetPagination()
+        return super().paginator
@@ -1,10 +1,25 @@
 from rest_framework import serializers
 
 from django.contrib.contenttypes.models import ContentType
+from netbox.api.fields import RelatedObjectCountField
 from netbox.api.serializers import NetBoxModelSerializer, WritableNestedSerializer
 from tenancy.api.serializers import ContactSerializer, TenantSerializer
 from dcim.api.serializers import ManufacturerSerializer
-from ..models import License, LicenseInstance
+from utilities.api import get_serializer_for_model
+from ..models import ExchangeRate, License, LicenseInstance
+
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Resolves keys from ``context['prefetched'][field_name]`` when bulk writes preloaded them"""
+
+    def to_internal_value(self, data):
+        prefetched = self.context.get('prefetched', {}).get(self.field_name)
+        # int(True) is 1; leave booleans to the parent class, which rejects them
+        if prefetched is not None and not isinstance(data, bool):
+            try:
+                return prefetched[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
+        return super().to_internal_value(data)
 
 class NestedLicenseSerializer(WritableNestedSerializer):
     url = serializers.HyperlinkedIdentityField(
@@ -33,14 +48,16 @@ class LicenseSerializer(NetBoxModelSerializer):
     # Computed fields for utilization tracking
     available_licenses = serializers.ReadOnlyField()
     utilization_percentage = serializers.ReadOnlyField()
-    instance_count = serializers.SerializerMethodField(read_only=True)
+    # Annotated by the viewset only when the field is requested
+    instance_count = RelatedObjectCountField('instances')
+
+    # Monthly-normalised cost, computed by the database
+    monthly_price = serializers.DecimalField(max_digits=14, decimal_places=4, read_only=True)
+    monthly_commitment = serializers.DecimalField(max_digits=18, decimal_places=4, read_only=True)
 
     vendor = ManufacturerSerializer(nested=True)
     tenant = TenantSerializer(nested=True)
 
-    def get_instance_count(self, obj):
-        return obj.instances.count()
-
     def validate_total_licenses(self, value):
         """Validate total_licenses cannot be reduced below consumed licenses"""
         if self.instance and self.instance.pk:
@@ -57,26 +74,51 @@ class LicenseSerializer(NetBoxModelSerializer):
         model = License
         fields = (
             'id', 'url', 'display', 'name', 'vendor', 'tenant', 'assignment_type', 
-            'price', 'currency', 'price_display',
+            'price', 'currency', 'price_display', 'billing_cycle', 'monthly_price', 'monthly_commitment',
             # NEW ENHANCEMENT FIELDS
             'external_id', 'total_licenses', 'consumed_licenses', 'available_licenses',
             'utilization_percentage', 'metadata',
+            # CAPACITY FORECAST
+            'forecast_exhaustion_date', 'forecast_confidence', 'forecast_updated',
             # EXISTING FIELDS
             'comments', 'tags', 'custom_fields', 'created', 'last_updated', 'instance_count'
         )
+        brief_fields = ('id', 'url', 'display', 'name', 'vendor', 'price', 'currency')
 
 class LicenseInstanceSerializer(NetBoxModelSerializer):
     url = serializers.HyperlinkedIdentityField(
         view_name='plugins-api:netbox_licenses-api:licenseinstance-detail'
     )
 
-    assigned_object_type = serializers.PrimaryKeyRelatedField(queryset=ContentType.objects.all())
+    assigned_object_type = PrefetchedPrimaryKeyRelatedField(queryset=ContentType.objects.all())
     assigned_object_id = serializers.IntegerField(required=False, allow_null=True)
-    license = serializers.PrimaryKeyRelatedField(queryset=License.objects.all())
+    license = PrefetchedPrimaryKeyRelatedField(queryset=License.objects.all())
     effective_price = serializers.SerializerMethodField(read_only=True)
     effective_currency = serializers.SerializerMethodField(read_only=True)
     price_in_nok = serializers.SerializerMethodField(read_only=True)
     conversion_rate_to_nok = serializers.SerializerMethodField(read_only=True)
+    # Brief representation of the assigned object; only rendered with ?expand=assigned_object
+    assigned_object = serializers.SerializerMethodField(read_only=True)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.context.get('expand_assigned_object'):
+            self.fields.pop('assigned_object', None)
+
+    def validate(self, data):
+        if self.context.get('bulk'):
+            # Bulk writes run model validation and the capacity check once per batch
+            return data
+        return super().validate(data)
+
+    def get_assigned_object(self, obj):
+        assigned_object = obj.assigned_object
+        if assigned_object is None:
+            return None
+        serializer = get_serializer_for_model(assigned_object)
+        data = serializer(assigned_object, nested=True, context=self.context).data
+        data['object_type'] = f'{assigned_object._meta.app_label}.{assigned_object._meta.model_name}'
+        return data
 
     def get_effective_price(self, obj):
         try:
@@ -97,16 +139,33 @@ class LicenseInstanceSerializer(NetBoxModelSerializer):
             return 0.0
 
     def get_conversion_rate_to_nok(self, obj):
-        # Return 1.0 as we don't have conversion rate tracking
-        return 1.0
+        try:
+            rate = ExchangeRate.get_rate(obj.license.currency)
+        except AttributeError:
+            return None
+        return float(rate) if rate is not None else None
 
     class Meta:
         model = LicenseInstance
         fields = (
-            'id', 'url', 'display_url', 'display', 'assigned_object_type', 'assigned_object_id', 'license',
+            'id', 'url', 'display_url', 'display', 'assigned_object_type', 'assigned_object_id', 'assigned_object',
+            'assigned_object_name', 'assigned_object_type_name', 'license',
             'effective_price', 'effective_currency', 'price_in_nok', 'conversion_rate_to_nok', 
             'price_override', 'currency_override', 'nok_price_override',
             'start_date', 'end_date', 'comments', 'tags', 
             'custom_fields', 'created', 'last_updated', 'custom_field_data'
         )
 
+
+class ExchangeRateSerializer(NetBoxModelSerializer):
+    url = serializers.HyperlinkedIdentityField(
+        view_name='plugins-api:netbox_licenses-api:exchangerate-detail'
+    )
+
+    class Meta:
+        model = ExchangeRate
+        fields = (
+            'id', 'url', 'display_url', 'display', 'currency', 'rate_to_nok', 'effective_date',
+            'comments', 'tags', 'custom_fields', 'created', 'last_updated'
+        )
+        brief_fields = ('id', 'url', 'display', 'currency', 'rate_to_nok', 'effective_date')
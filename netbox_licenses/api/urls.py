@@ -1,3 +1,4 @@
+from django.urls import path
 from netbox.api.routers import NetBoxRouter
 from . import views
 
@@ -6,5 +7,8 @@ app_name = 'netbox_licenses'
 router = NetBoxRouter()
 router.register('licenses', views.LicenseViewSet)
 router.register('licenseinstances', views.LicenseInstanceViewSet)
+router.register('exchangerates', views.ExchangeRateViewSet)
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path('report-cache/', views.ReportCacheStatsView.as_view(), name='report_cache_stats'),
+]
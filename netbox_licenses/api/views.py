@@ -1,19 +1,95 @@
+from netbox.api.authentication import TokenPermissions
 from netbox.api.viewsets import NetBoxModelViewSet
-from django.db.models import Count
-from django.db import IntegrityError
+from netbox.api.serializers import BulkOperationSerializer
+from netbox.plugins import get_plugin_config
+from core.choices import ObjectChangeActionChoices
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.decorators import method_decorator
 from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from .. import filtersets, models
-from .serializers import LicenseSerializer, LicenseInstanceSerializer
-
-class LicenseViewSet(NetBoxModelViewSet):
-    queryset = models.License.objects.prefetch_related(
-        'tags', 'tenant', 'vendor'
-    ).annotate(
-        instance_count=Count('instances')
-    ).order_by('name')
+from ..caching import bump_data_version, data_condition, get_report_cache_stats, reset_report_cache_stats
+from ..exports import EXPORT_FORMATS, streaming_export_response
+from .pagination import KeysetPaginationMixin
+from ..services import (
+    AnalyticsService, LicenseInstanceBulkService, LicenseLifecycleService, ANALYTICS_ROLLUP_TIERS,
+    EXPIRY_TIMELINE_INTERVALS, TREND_RESOLUTIONS,
+)
+from .serializers import ExchangeRateSerializer, LicenseSerializer, LicenseInstanceSerializer
+
+# Most object IDs accepted by one licenseinstances/by-object/ request
+BY_OBJECT_MAX_IDS = 5000
+
+# Longest window, in months, the expiry timeline can cover
+EXPIRY_TIMELINE_MAX_MONTHS = 60
+
+# Largest page the savings ranking returns
+SAVINGS_MAX_PER_PAGE = 500
+
+class ReadOnlyPostPermissions(TokenPermissions):
+    """Token permissions for POST actions that only read
+
+    POST requires the model's view permission, as GET does, and read-only
+    tokens are accepted.
+    """
+    perms_map = {**TokenPermissions.perms_map, 'POST': TokenPermissions.perms_map['GET']}
+
+    def _verify_write_permission(self, request):
+        return True
+
+
+class ConditionalGetMixin:
+    """Answer unchanged list and detail GETs with 304 before querying or serializing
+
+    ``data_models`` lists every model whose changes can alter the response.
+    """
+    data_models = ()
+
+    def list(self, request, *args, **kwargs):
+        return data_condition(*self.data_models)(super().list)(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return data_condition(*self.data_models)(super().retrieve)(request, *args, **kwargs)
+
+
+class StreamingExportMixin:
+    """Adds a streaming CSV/NDJSON ``export`` action over the filtered queryset"""
+    export_filename = None
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        # Not ?format=, which DRF reserves for renderer selection
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'error': f'export_format must be one of: {", ".join(EXPORT_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        # A bare restricted queryset: the list queryset's annotations and prefetches
+        # would otherwise be computed for every exported row
+        queryset = self.filter_queryset(self.queryset.model.objects.restrict(request.user, 'view'))
+        return streaming_export_response(queryset, export_format, self.export_filename, user=request.user)
+
+
+class LicenseViewSet(StreamingExportMixin, ConditionalGetMixin, KeysetPaginationMixin, NetBoxModelViewSet):
+    # instance_count and the nested vendor/tenant prefetches are added by
+    # NetBoxModelViewSet.get_queryset() for the fields actually requested,
+    # so ?fields= and ?brief= only pay for the columns they return
+    queryset = models.License.objects.select_related(
+        'tenant', 'vendor'
+    ).prefetch_related('tags').with_monthly_costs().order_by('name')
     serializer_class = LicenseSerializer
+    filterset_class = filtersets.LicenseFilterSet
+    data_models = (models.License, models.LicenseInstance, models.ExchangeRate)
+    export_filename = 'licenses'
 
     def create(self, request, *args, **kwargs):
         try:
@@ -29,9 +105,371 @@ class LicenseViewSet(NetBoxModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-class LicenseInstanceViewSet(NetBoxModelViewSet):
-    queryset = models.LicenseInstance.objects.prefetch_related(
-        'license', 'assigned_object', 'tags'
-    ).order_by('license__name', 'id')
+    @action(detail=False, methods=['get'], url_path='trends')
+    @method_decorator(data_condition(models.License, models.LicenseAnalytics, *ANALYTICS_ROLLUP_TIERS))
+    def trends(self, request):
+        """Trend statistics for every license, computed in one vectorized pass"""
+        metric_type = request.query_params.get('metric', 'utilization')
+        if metric_type not in dict(models.LicenseAnalytics.METRIC_TYPES):
+            return Response(
+                {'error': f'Unknown metric: {metric_type}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        resolution = request.query_params.get('resolution')
+        if resolution is not None and resolution not in TREND_RESOLUTIONS:
+            return Response(
+                {'error': f'Resolution must be one of: {", ".join(TREND_RESOLUTIONS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            days = int(request.query_params.get('days', 30))
+        except ValueError:
+            return Response({'error': 'days must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(AnalyticsService.get_portfolio_trends(
+            metric_type,
+            days,
+            resolution=TREND_RESOLUTIONS.get(resolution),
+            licenses=self.filter_queryset(self.get_queryset())
+        ))
+
+    @action(detail=False, methods=['get'], url_path='savings')
+    @method_decorator(data_condition(models.License, models.LicenseInstance, models.ExchangeRate))
+    def savings(self, request):
+        """Seat-reduction savings ranked over the filtered licenses, one page at a time
+
+        Accepts ?page=, ?per_page= (max 500), ?min_savings= (annual NOK) and
+        ?threshold= (utilization percentage below which a license qualifies)
+        along with the regular license filters.
+        """
+        try:
+            page = int(request.query_params.get('page', 1))
+            per_page = int(request.query_params.get('per_page', 50))
+            min_savings = float(request.query_params.get('min_savings', 0))
+            threshold = int(request.query_params.get('threshold', 70))
+        except ValueError:
+            return Response(
+                {'error': 'page, per_page and threshold must be integers and min_savings a number'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if page < 1 or not 1 <= per_page <= SAVINGS_MAX_PER_PAGE or not 1 <= threshold <= 100:
+            return Response(
+                {'error': f'page must be at least 1, per_page between 1 and {SAVINGS_MAX_PER_PAGE} '
+                          f'and threshold between 1 and 100'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(AnalyticsService.get_savings_opportunities(
+            page, per_page, min_savings, threshold,
+            licenses=self.filter_queryset(self.get_queryset())
+        ))
+
+class LicenseInstanceViewSet(StreamingExportMixin, ConditionalGetMixin, KeysetPaginationMixin, NetBoxModelViewSet):
+    queryset = models.LicenseInstance.objects.select_related(
+        'license'
+    ).prefetch_related('tags').order_by('license__name', 'id')
     serializer_class = LicenseInstanceSerializer
     filterset_class = filtersets.LicenseInstanceFilterSet
+    data_models = (models.LicenseInstance, models.License, models.ExchangeRate)
+    export_filename = 'license_instances'
+
+    @property
+    def expand_assigned_object(self):
+        """True when the client asked for ?expand=assigned_object"""
+        request = getattr(self, 'request', None)
+        if request is None:
+            return False
+        return 'assigned_object' in request.query_params.get('expand', '').split(',')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.expand_assigned_object:
+            # Generic prefetch issues one query per assigned object content type
+            queryset = queryset.prefetch_related('assigned_object')
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['expand_assigned_object'] = self.expand_assigned_object
+        return context
+
+    @action(detail=False, methods=['get'], url_path='expiry-timeline')
+    @method_decorator(data_condition(models.LicenseInstance, models.License, models.ExchangeRate))
+    def expiry_timeline(self, request):
+        """Expiring seats and NOK renewal value per week or month
+
+        Accepts ?interval=week|month and ?months=N (default 12) along with the
+        regular filters, e.g. ?vendor=, ?tenant= and ?auto_renew=.
+        """
+        interval = request.query_params.get('interval', 'month')
+        if interval not in EXPIRY_TIMELINE_INTERVALS:
+            return Response(
+                {'error': f'Interval must be one of: {", ".join(EXPIRY_TIMELINE_INTERVALS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            months = int(request.query_params.get('months', 12))
+        except ValueError:
+            return Response({'error': 'months must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= months <= EXPIRY_TIMELINE_MAX_MONTHS:
+            return Response(
+                {'error': f'months must be between 1 and {EXPIRY_TIMELINE_MAX_MONTHS}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        timeline = LicenseLifecycleService.get_expiry_timeline(
+            self.filter_queryset(self.get_queryset()), interval, months
+        )
+        return Response({
+            'interval': interval,
+            'months': months,
+            'seats': sum(bucket['seats'] for bucket in timeline),
+            'renewal_value_nok': sum(bucket['renewal_value_nok'] for bucket in timeline),
+            'results': timeline,
+        })
+
+    @action(
+        detail=False, methods=['post'], url_path='by-object',
+        permission_classes=[ReadOnlyPostPermissions]
+    )
+    def by_object(self, request):
+        """Licenses, costs and statuses for many assigned objects of one type
+
+        Expects ``{"assigned_object_type": "dcim.device", "ids": [1, 2, ...]}``;
+        the type may also be given as a content type ID. This is a read, sent as
+        POST only because the ID list is too long for a query string, so it
+        requires view (not add) permission on license instances.
+        """
+        data = request.data if isinstance(request.data, dict) else {}
+
+        content_type = self._get_assignable_content_type(data.get('assigned_object_type'))
+        if content_type is None:
+            return Response(
+                {'assigned_object_type': [
+                    'Must be an assignable object type: '
+                    + ', '.join(sorted(models.ASSIGNED_OBJECT_TYPE_LABELS))
+                ]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        ids = data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            return Response({'ids': ['Expected a non-empty list of object IDs']}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > BY_OBJECT_MAX_IDS:
+            return Response(
+                {'ids': [f'At most {BY_OBJECT_MAX_IDS} object IDs may be requested at once']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            ids = [int(pk) for pk in ids]
+        except (TypeError, ValueError):
+            return Response({'ids': ['Object IDs must be integers']}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = LicenseInstanceBulkService.get_licenses_by_object(
+            models.LicenseInstance.objects.restrict(request.user, 'view'), content_type, ids
+        )
+        return Response({
+            'assigned_object_type': f'{content_type.app_label}.{content_type.model}',
+            'count': len(results),
+            'results': [{'assigned_object_id': pk, **entry} for pk, entry in results.items()],
+        })
+
+    @staticmethod
+    def _get_assignable_content_type(value):
+        """Resolve an ``app_label.model`` string or content type ID to an assignable ContentType"""
+        try:
+            if isinstance(value, str) and '.' in value:
+                content_type = ContentType.objects.get_by_natural_key(*value.lower().split('.', 1))
+            else:
+                content_type = ContentType.objects.get_for_id(int(value))
+        except (ContentType.DoesNotExist, TypeError, ValueError):
+            return None
+        if content_type.model not in models.ASSIGNED_OBJECT_TYPE_LABELS:
+            return None
+        return content_type
+
+    # Bulk operations
+    #
+    # List payloads are validated field by field, capacity is checked once per
+    # affected license and rows are written with bulk_create/bulk_update in one
+    # transaction. If any item fails nothing is written and the response lists
+    # the errors per item, in request order ({} for valid items).
+
+    def create(self, request, *args, **kwargs):
+        if isinstance(request.data, list):
+            return self._bulk_write(request, request.data)
+        return super().create(request, *args, **kwargs)
+
+    def bulk_update(self, request, *args, **kwargs):
+        partial = kwargs.pop('partial', False)
+        if not isinstance(request.data, list):
+            return Response({'detail': 'Expected a list of objects'}, status=status.HTTP_400_BAD_REQUEST)
+        return self._bulk_write(request, request.data, update=True, partial=partial)
+
+    def bulk_destroy(self, request, *args, **kwargs):
+        serializer = BulkOperationSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        pks = [item['id'] for item in serializer.validated_data]
+
+        instances = self.get_queryset().in_bulk(pks)
+        errors = [{} if pk in instances else {'id': ['Object not found']} for pk in pks]
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        license_ids = {instance.license_id for instance in instances.values()}
+        with transaction.atomic(), models.bulk_instance_changes():
+            models.LicenseInstance.objects.filter(pk__in=pks).delete()
+            if get_plugin_config('netbox_licenses', 'auto_calculate_utilization', False):
+                LicenseInstanceBulkService.refresh_consumed_licenses(license_ids)
+
+        return Response([{'id': pk, 'status': 'deleted'} for pk in pks])
+
+    def _prefetch_related(self, items):
+        """Preload the licenses and content types referenced by a bulk payload"""
+        def referenced(field):
+            keys = set()
+            for item in items:
+                try:
+                    value = item.get(field)
+                    if isinstance(value, bool):
+                        continue
+                    keys.add(int(value))
+                except (AttributeError, TypeError, ValueError):
+                    pass
+            return keys
+
+        return {
+            'license': models.License.objects.select_related('assignment_type').in_bulk(referenced('license')),
+            'assigned_object_type': ContentType.objects.in_bulk(referenced('assigned_object_type')),
+        }
+
+    def _bulk_write(self, request, items, update=False, partial=False):
+        context = self.get_serializer_context()
+        context['bulk'] = True
+        context['prefetched'] = self._prefetch_related(items)
+
+        existing = {}
+        if update:
+            existing = self.get_queryset().in_bulk([
+                item.get('id') for item in items if isinstance(item, dict) and item.get('id') is not None
+            ])
+
+        errors = [{} for _ in items]
+        pending = []  # (index, instance, validated data, tags, previous license ID)
+        additions = {}
+        with models.bulk_instance_changes():
+            for index, item in enumerate(items):
+                instance = None
+                if update:
+                    instance = existing.get(item.get('id')) if isinstance(item, dict) else None
+                    if instance is None:
+                        errors[index] = {'id': ['Object not found']}
+                        continue
+                    instance.snapshot()
+
+                serializer = self.get_serializer_class()(instance, data=item, partial=partial, context=context)
+                if not serializer.is_valid():
+                    errors[index] = serializer.errors
+                    continue
+
+                data = dict(serializer.validated_data)
+                tags = data.pop('tags', None)
+                previous_license_id = instance.license_id if instance else None
+                if instance is None:
+                    instance = models.LicenseInstance(**data)
+                else:
+                    for attr, value in data.items():
+                        setattr(instance, attr, value)
+
+                instance.apply_defaults()
+                try:
+                    # The related objects were resolved by the serializer, so skip the per-row lookups
+                    instance.full_clean(exclude=['license', 'assigned_object_type'])
+                except ValidationError as e:
+                    errors[index] = e.message_dict if hasattr(e, 'error_dict') else {'non_field_errors': e.messages}
+                    continue
+
+                if instance.license_id != previous_license_id:
+                    additions[instance.license_id] = additions.get(instance.license_id, 0) + 1
+                    if previous_license_id is not None:
+                        additions[previous_license_id] = additions.get(previous_license_id, 0) - 1
+                pending.append((index, instance, data, tags, previous_license_id))
+
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        instances = [instance for _, instance, _, _, _ in pending]
+        LicenseInstanceBulkService.set_assignment_display(instances)
+        license_ids = {instance.license_id for instance in instances}
+        license_ids.update(previous for *_, previous in pending if previous is not None)
+
+        with transaction.atomic(), models.bulk_instance_changes():
+            # Lock the affected licenses so concurrent writes cannot both pass the capacity check
+            list(
+                models.License.objects.select_for_update().filter(pk__in=license_ids).order_by('pk').values_list('pk')
+            )
+            capacity_errors = LicenseInstanceBulkService.check_capacity(additions)
+            for index, instance, data, tags, previous_license_id in pending:
+                if instance.license_id in capacity_errors and instance.license_id != previous_license_id:
+                    errors[index] = {'license': [capacity_errors[instance.license_id]]}
+            if any(errors):
+                return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+            if update:
+                fields = {
+                    'last_updated', 'assigned_object_type', 'end_date',
+                    'assigned_object_name', 'assigned_object_type_name',
+                }
+                for _, instance, data, _, _ in pending:
+                    fields.update(data)
+                    instance.last_updated = timezone.now()
+                models.LicenseInstance.objects.bulk_update(instances, sorted(fields), batch_size=500)
+                action = ObjectChangeActionChoices.ACTION_UPDATE
+            else:
+                instances = models.LicenseInstance.objects.bulk_create(instances, batch_size=500)
+                action = ObjectChangeActionChoices.ACTION_CREATE
+            bump_data_version(models.LicenseInstance)
+
+            for instance, (_, _, _, tags, _) in zip(instances, pending):
+                if tags is not None:
+                    instance.tags.set(tags)
+
+            # Enforce object-level permission constraints on the written rows; raising
+            # here rolls the whole batch back
+            try:
+                self._validate_objects(instances)
+            except ObjectDoesNotExist:
+                raise PermissionDenied()
+
+            if get_plugin_config('netbox_licenses', 'auto_calculate_utilization', False):
+                LicenseInstanceBulkService.refresh_consumed_licenses(license_ids)
+            LicenseInstanceBulkService.log_changes(instances, action, request)
+            LicenseInstanceBulkService.update_search_cache(instances)
+
+        serializer = self.get_serializer_class()(instances, many=True, context=self.get_serializer_context())
+        return Response(
+            serializer.data,
+            status=status.HTTP_200_OK if update else status.HTTP_201_CREATED
+        )
+
+
+class ExchangeRateViewSet(ConditionalGetMixin, NetBoxModelViewSet):
+    queryset = models.ExchangeRate.objects.prefetch_related('tags')
+    serializer_class = ExchangeRateSerializer
+    filterset_class = filtersets.ExchangeRateFilterSet
+    data_models = (models.ExchangeRate,)
+
+
+class ReportCacheStatsView(APIView):
+    """Hit and miss counts of the report cache; DELETE resets them"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(get_report_cache_stats())
+
+    def delete(self, request):
+        reset_report_cache_stats()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,188 @@
+"""
+Per-model data versions and conditional GET support.
+
+Every write to a plugin model bumps that model's data version, a timestamp
+kept in the Django cache. API endpoints derive their ETag and Last-Modified
+headers from the versions of the models they read, so polling clients with an
+unchanged copy are answered with 304 Not Modified before any query,
+aggregation or serialization runs. HTML pages are not: they also carry
+messages, the CSRF token and user preferences that no data version reflects.
+
+The same versions key the report cache, which the HTML reports do use:
+expensive report contexts are stored
+for ``caching_config['timeout']`` seconds under a key that changes as soon as
+one of the models they read is written.
+"""
+import functools
+import hashlib
+import time
+from datetime import datetime, time as dt_time, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+
+def _cache_config():
+    from . import LicenseManagementConfig
+
+    return LicenseManagementConfig.caching_config
+
+
+def _version_key(model):
+    return f"{_cache_config()['cache_key']}:data-version:{model._meta.label_lower}"
+
+
+def bump_data_version(*models):
+    """Mark the given models as changed once the current transaction commits
+
+    Signals cover ordinary saves and deletes; bulk_create(), bulk_update() and
+    update() bypass them, so set-based writers call this directly.
+    """
+    def bump():
+        now = time.time()
+        cache.set_many({_version_key(model): now for model in models}, timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def get_data_version(*models) -> float:
+    """Latest data version (a UNIX timestamp) across the given models"""
+    keys = {_version_key(model): model for model in models}
+    versions = cache.get_many(keys)
+
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        # Unknown after a cache flush: start a new version rather than trust stale copies
+        now = time.time()
+        for key in missing:
+            cache.add(key, now, timeout=None)
+        versions.update(cache.get_many(missing))
+
+    return max(versions.values(), default=0.0)
+
+
+def data_condition(*models):
+    """
+    View decorator answering conditional GETs from the data versions of ``models``.
+
+    For JSON/API responses only; see the module docstring.
+
+    The ETag also covers the full request path, the user (querysets are
+    permission-restricted) and today's date, since expiry and renewal figures
+    change with the calendar. Last-Modified is never earlier than midnight.
+    """
+    def last_modified(request, *args, **kwargs):
+        modified = datetime.fromtimestamp(get_data_version(*models), tz=dt_timezone.utc)
+        midnight = timezone.make_aware(datetime.combine(timezone.localdate(), dt_time.min))
+        return max(modified, midnight)
+
+    def etag(request, *args, **kwargs):
+        user = getattr(request, 'user', None)
+        raw = ':'.join((
+            str(get_data_version(*models)),
+            timezone.localdate().isoformat(),
+            request.get_full_path(),
+            str(getattr(user, 'pk', '')),
+            request.META.get('HTTP_ACCEPT', ''),
+        ))
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+# Reports cached through get_report() and cached_report(). Declared here rather than
+# collected as views are imported, so the stats cover every report from process start.
+REPORT_CACHES = (
+    'dashboard',
+    'utilization_report',
+    'vendor_utilization',
+    'license_analytics',
+    'cost_allocation',
+    'license_renewals',
+    'savings_opportunities',
+)
+
+
+def _stats_key(name, outcome):
+    return f"{_cache_config()['cache_key']}:report-stats:{name}:{outcome}"
+
+
+def _count(name, outcome):
+    key = _stats_key(name, outcome)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+def get_report(name, models, build, vary=()):
+    """
+    Return the report built by ``build()``, cached under the data versions of ``models``.
+
+    Entries expire after ``caching_config['timeout']`` seconds, but any write
+    to one of the models moves the report to a new key straight away.
+    """
+    raw = ':'.join((
+        str(get_data_version(*models)),
+        timezone.localdate().isoformat(),
+        *(str(value) for value in vary),
+    ))
+    key = f"{_cache_config()['cache_key']}:report:{name}:{hashlib.md5(raw.encode()).hexdigest()}"
+
+    report = cache.get(key)
+    if report is not None:
+        _count(name, 'hits')
+        return report
+
+    _count(name, 'misses')
+    report = build()
+    cache.set(key, report, _cache_config()['timeout'])
+    return report
+
+
+def cached_report(name, *models):
+    """
+    Decorator caching a view method's ``(self, request)`` report context.
+
+    The cache entry varies with the request's query parameters; anything
+    user-specific (tables, forms) must be added to the context outside it.
+    ``name`` must be declared in REPORT_CACHES.
+    """
+    if name not in REPORT_CACHES:
+        raise ValueError(f'Report "{name}" is not declared in REPORT_CACHES')
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            return get_report(
+                name, models,
+                lambda: method(self, request, *args, **kwargs),
+                vary=sorted(request.GET.lists()),
+            )
+        return wrapper
+    return decorator
+
+
+def get_report_cache_stats():
+    """Hit and miss counts for every cached report"""
+    keys = {_stats_key(name, outcome): (name, outcome) for name in REPORT_CACHES for outcome in ('hits', 'misses')}
+    counts = cache.get_many(keys)
+
+    stats = {}
+    for name in REPORT_CACHES:
+        hits = counts.get(_stats_key(name, 'hits'), 0)
+        misses = counts.get(_stats_key(name, 'misses'), 0)
+        stats[name] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None,
+        }
+    return stats
+
+
+def reset_report_cache_stats():
+    cache.delete_many([_stats_key(name, outcome) for name in REPORT_CACHES for outcome in ('hits', 'misses')])
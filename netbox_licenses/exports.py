@@ -0,0 +1,184 @@
+"""
+Streaming CSV/NDJSON exports of licenses and license instances.
+
+Rows are read with ``values().iterator()`` in fixed-size chunks and written
+out as they are produced, so memory use does not grow with the export size.
+Assigned object names come from the denormalized columns on LicenseInstance.
+Exports made for a user read other related names through querysets
+restricted to what that user may view, rather than joining them in.
+"""
+import csv
+import json
+from itertools import islice
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+# (column, lookup) pairs read with values()
+LICENSE_EXPORT_COLUMNS = (
+    ('id', 'id'),
+    ('name', 'name'),
+    ('vendor', 'vendor__name'),
+    ('tenant', 'tenant__name'),
+    ('external_id', 'external_id'),
+    ('total_licenses', 'total_licenses'),
+    ('consumed_licenses', 'consumed_licenses'),
+    ('price', 'price'),
+    ('currency', 'currency'),
+    ('billing_cycle', 'billing_cycle'),
+    ('monthly_price', 'monthly_price'),
+    ('auto_renew', 'auto_renew'),
+    ('forecast_exhaustion_date', 'forecast_exhaustion_date'),
+    ('created', 'created'),
+    ('last_updated', 'last_updated'),
+)
+
+LICENSE_INSTANCE_EXPORT_COLUMNS = (
+    ('id', 'id'),
+    ('license_id', 'license_id'),
+    ('license', 'license__name'),
+    ('vendor', 'license__vendor__name'),
+    ('assigned_object_type_id', 'assigned_object_type_id'),
+    ('assigned_object_id', 'assigned_object_id'),
+    ('nok_price_override', 'nok_price_override'),
+    ('start_date', 'start_date'),
+    ('end_date', 'end_date'),
+    ('auto_renew', 'auto_renew'),
+    ('created', 'created'),
+    ('last_updated', 'last_updated'),
+    ('assigned_object', 'assigned_object_name'),
+)
+
+# Columns added to instance rows by resolve_assigned_objects()
+ASSIGNED_OBJECT_COLUMNS = ('assigned_object_type',)
+
+# Related name lookups in the columns above, with the ID lookup and model they are
+# read from when an export is restricted to a user's view permissions
+RELATED_NAME_LOOKUPS = {
+    'vendor__name': ('vendor_id', 'dcim.Manufacturer'),
+    'tenant__name': ('tenant_id', 'tenancy.Tenant'),
+    'license__name': ('license_id', 'netbox_licenses.License'),
+    'license__vendor__name': ('license__vendor_id', 'dcim.Manufacturer'),
+}
+
+
+def iter_chunks(queryset, columns, chunk_size=EXPORT_CHUNK_SIZE, ordering=('pk',), user=None):
+    """Yield lists of row dicts keyed by column name, ``chunk_size`` rows at a time
+
+    With ``user``, related names are looked up once per chunk through
+    querysets restricted to what the user may view; names of objects the user
+    cannot see are left blank.
+    """
+    restricted = {}
+    lookups = []
+    for index, (_, lookup) in enumerate(columns):
+        if user is not None and lookup in RELATED_NAME_LOOKUPS:
+            id_lookup, model = RELATED_NAME_LOOKUPS[lookup]
+            restricted[index] = apps.get_model(model)
+            lookup = id_lookup
+        lookups.append(lookup)
+
+    rows = queryset.prefetch_related(None).order_by(*ordering).values_list(*lookups).iterator(chunk_size=chunk_size)
+    names = [name for name, _ in columns]
+    known = {model: {} for model in restricted.values()}
+    while chunk := list(islice(rows, chunk_size)):
+        if restricted:
+            chunk = _resolve_names(chunk, restricted, known, user)
+        yield [dict(zip(names, row)) for row in chunk]
+
+
+def _resolve_names(chunk, restricted, known, user):
+    """Replace the related IDs in ``chunk`` with names the user may view, caching them in ``known``"""
+    for index, model in restricted.items():
+        names = known[model]
+        missing = {row[index] for row in chunk if row[index] is not None} - names.keys()
+        if missing:
+            names.update(dict.fromkeys(missing, ''))
+            names.update(model.objects.restrict(user, 'view').filter(pk__in=missing).values_list('pk', 'name'))
+
+    return [
+        tuple(
+            known[restricted[index]].get(value, '') if index in restricted else value
+            for index, value in enumerate(row)
+        )
+        for row in chunk
+    ]
+
+
+def resolve_assigned_objects(rows):
+    """Add the assigned object type label to a chunk of instance rows
+
+    The object's name is read from the denormalized assigned_object_name
+    column and content types come from ContentType's cache, so this runs no
+    queries against the assigned objects' tables.
+    """
+    for row in rows:
+        type_id = row['assigned_object_type_id']
+        if type_id:
+            content_type = ContentType.objects.get_for_id(type_id)
+            row['assigned_object_type'] = f'{content_type.app_label}.{content_type.model}'
+        else:
+            row['assigned_object_type'] = ''
+    return rows
+
+
+class _Echo:
+    """File-like object whose write() returns the written line, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def stream_rows(chunks, fieldnames, export_format):
+    """Render an iterable of row chunks as CSV or NDJSON lines"""
+    if export_format == 'csv':
+        writer = csv.DictWriter(_Echo(), fieldnames=fieldnames)
+        yield writer.writeheader()
+        for chunk in chunks:
+            yield ''.join(writer.writerow(row) for row in chunk)
+    else:
+        for chunk in chunks:
+            yield ''.join(json.dumps(row, cls=DjangoJSONEncoder) + '\n' for row in chunk)
+
+
+def license_export_chunks(queryset, chunk_size=EXPORT_CHUNK_SIZE, user=None):
+    return iter_chunks(queryset, LICENSE_EXPORT_COLUMNS, chunk_size, user=user)
+
+
+def license_instance_export_chunks(queryset, chunk_size=EXPORT_CHUNK_SIZE, user=None):
+    for chunk in iter_chunks(queryset, LICENSE_INSTANCE_EXPORT_COLUMNS, chunk_size, user=user):
+        yield resolve_assigned_objects(chunk)
+
+
+def streaming_export_response(queryset, export_format, filename, user=None):
+    """StreamingHttpResponse exporting a License or LicenseInstance queryset
+
+    ``queryset`` should be a plain, permission-restricted queryset: the export
+    selects only its own columns, but annotations on it would still be computed.
+    """
+    from .models import License
+
+    if queryset.model is License:
+        chunks = license_export_chunks(queryset, user=user)
+        fieldnames = [name for name, _ in LICENSE_EXPORT_COLUMNS]
+    else:
+        chunks = license_instance_export_chunks(queryset, user=user)
+        fieldnames = [name for name, _ in LICENSE_INSTANCE_EXPORT_COLUMNS] + list(ASSIGNED_OBJECT_COLUMNS)
+
+    response = StreamingHttpResponse(
+        stream_rows(chunks, fieldnames, export_format),
+        content_type=EXPORT_FORMATS[export_format]
+    )
+    timestamp = timezone.now().strftime('%Y%m%d%H%M%S')
+    response['Content-Disposition'] = f'attachment; filename="{filename}_{timestamp}.{export_format}"'
+    return response
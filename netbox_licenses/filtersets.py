@@ -1,11 +1,15 @@
+import json
+
 import django_filters
 from django.db import models
 from netbox.filtersets import NetBoxModelFilterSet
 from netbox.forms import NetBoxModelFilterSetForm
 from django import forms
-from .models import LicenseInstance, License, LicenseStatusChoices
-from tenancy.models import Contact
+from .models import ExchangeRate, LicenseInstance, License, LicenseStatusChoices, instance_status_expression
+from .choices import CurrencyChoices
+from tenancy.models import Contact, Tenant
 from dcim.models import Manufacturer
+from utilities.filters import MultiValueCharFilter
 
 
 class LicenseFilterSet(NetBoxModelFilterSet):
@@ -16,10 +20,23 @@ class LicenseFilterSet(NetBoxModelFilterSet):
     overallocated = django_filters.BooleanFilter(method='filter_overallocated')
     total_licenses__gte = django_filters.NumberFilter(field_name='total_licenses', lookup_expr='gte')
     consumed_licenses__gte = django_filters.NumberFilter(field_name='consumed_licenses', lookup_expr='gte')
+    forecast_exhaustion_date__lte = django_filters.DateFilter(field_name='forecast_exhaustion_date', lookup_expr='lte')
+    forecast_exhaustion_date__gte = django_filters.DateFilter(field_name='forecast_exhaustion_date', lookup_expr='gte')
+    forecast_confidence__gte = django_filters.NumberFilter(field_name='forecast_confidence', lookup_expr='gte')
+    monthly_price__gte = django_filters.NumberFilter(field_name='monthly_price', lookup_expr='gte')
+    monthly_price__lte = django_filters.NumberFilter(field_name='monthly_price', lookup_expr='lte')
+    exhausts_within_days = django_filters.NumberFilter(method='filter_exhausts_within_days')
+    metadata_has_key = MultiValueCharFilter(method='filter_metadata_has_key', label='Metadata has key')
+    metadata_contains = django_filters.Filter(
+        field_class=forms.JSONField,
+        method='filter_metadata_contains',
+        label='Metadata contains (JSON)',
+    )
+    metadata_path = MultiValueCharFilter(method='filter_metadata_path', label='Metadata path=value')
     
     class Meta:
         model = License
-        fields = ('id', 'name', 'vendor', 'external_id', 'total_licenses', 'consumed_licenses')
+        fields = ('id', 'name', 'vendor', 'external_id', 'total_licenses', 'consumed_licenses', 'forecast_exhaustion_date')
     
     def filter_has_external_id(self, queryset, name, value):
         if value:
@@ -36,8 +53,67 @@ class LicenseFilterSet(NetBoxModelFilterSet):
             return queryset.filter(consumed_licenses__gt=models.F('total_licenses'))
         return queryset
 
+    def filter_exhausts_within_days(self, queryset, name, value):
+        from datetime import timedelta
+        from django.utils import timezone
+
+        if value is None:
+            return queryset
+        return queryset.filter(forecast_exhaustion_date__lte=timezone.localdate() + timedelta(days=int(value)))
+
+    # The metadata filters compile to jsonb ?& and @> so they can use the GIN index on metadata
+
+    def filter_metadata_has_key(self, queryset, name, value):
+        return queryset.filter(metadata__has_keys=value)
+
+    def filter_metadata_contains(self, queryset, name, value):
+        return queryset.filter(metadata__contains=value)
+
+    def filter_metadata_path(self, queryset, name, value):
+        """
+        Match ``a.b.c=value`` pairs. The leaf may hold the value itself or a list
+        containing it, so ``service_plans=EXCHANGE_S_ENTERPRISE`` matches both
+        ``{"service_plans": "EXCHANGE_S_ENTERPRISE"}`` and a list of plans.
+        Values are read as JSON where possible (numbers, booleans), else as text.
+        A path without ``=`` only requires the key to exist.
+        """
+        for item in value:
+            path, sep, raw = item.partition('=')
+            keys = [key for key in path.split('.') if key]
+            if not keys:
+                continue
+
+            if not sep:
+                *parents, leaf = keys
+                lookup = '__'.join(['metadata', *parents, 'has_key'])
+                queryset = queryset.filter(**{lookup: leaf})
+                continue
+
+            try:
+                leaf_value = json.loads(raw)
+            except ValueError:
+                leaf_value = raw
+
+            def nest(leaf):
+                for key in reversed(keys):
+                    leaf = {key: leaf}
+                return leaf
+
+            queryset = queryset.filter(
+                models.Q(metadata__contains=nest(leaf_value)) | models.Q(metadata__contains=nest([leaf_value]))
+            )
+        return queryset
+
 
 class LicenseInstanceFilterSet(NetBoxModelFilterSet):
+    vendor = django_filters.ModelMultipleChoiceFilter(
+        field_name='license__vendor', queryset=Manufacturer.objects.all()
+    )
+    tenant = django_filters.ModelMultipleChoiceFilter(
+        field_name='license__tenant', queryset=Tenant.objects.all()
+    )
+    auto_renew = django_filters.BooleanFilter(method='filter_auto_renew', label='Auto-renew')
+    assigned_object_name = django_filters.CharFilter(lookup_expr='icontains')
     start_date__gte = django_filters.DateFilter(field_name='start_date', lookup_expr='gte')
     end_date__lte = django_filters.DateFilter(field_name='end_date', lookup_expr='lte')
 
@@ -61,14 +137,29 @@ class LicenseInstanceFilterSet(NetBoxModelFilterSet):
 
     class Meta:
         model = LicenseInstance
-        fields = ('id', 'license', 'start_date', 'end_date', 'start_date__gte', 'end_date__lte', 'derived_status', 'expiry_status')
+        fields = (
+            'id', 'license', 'assigned_object_type', 'assigned_object_id', 'assigned_object_name',
+            'start_date', 'end_date', 'start_date__gte', 'end_date__lte', 'derived_status', 'expiry_status'
+        )
 
     def search(self, queryset, name, value):
-        return queryset.filter(description_icontains=value)
+        if not value.strip():
+            return queryset
+        return queryset.filter(
+            models.Q(assigned_object_name__icontains=value) |
+            models.Q(license__name__icontains=value) |
+            models.Q(comments__icontains=value)
+        )
 
     def filter_derived_status(self, queryset, name, values):
+        if not values:
+            return queryset
+        return queryset.alias(status=instance_status_expression()).filter(status__in=values)
+
+    def filter_auto_renew(self, queryset, name, value):
+        # Instances without their own setting follow the license
         return queryset.filter(
-            pk__in=[obj.pk for obj in queryset if obj.derived_status in values]
+            models.Q(auto_renew=value) | models.Q(auto_renew__isnull=True, license__auto_renew=value)
         )
 
     def filter_expiry_status(self, queryset, name, value):
@@ -96,6 +187,19 @@ class LicenseInstanceFilterForm(NetBoxModelFilterSetForm):
         queryset=License.objects.all(),
         required=False
     )
+    vendor = forms.ModelMultipleChoiceField(
+        queryset=Manufacturer.objects.all(),
+        required=False
+    )
+    tenant = forms.ModelMultipleChoiceField(
+        queryset=Tenant.objects.all(),
+        required=False
+    )
+    auto_renew = forms.NullBooleanField(
+        required=False,
+        label="Auto-renew",
+        help_text="Instance setting, or the license default when not overridden"
+    )
     derived_status = forms.MultipleChoiceField(
         choices=LicenseStatusChoices,
         required=False,
@@ -166,7 +270,73 @@ class LicenseFilterForm(NetBoxModelFilterSetForm):
         label="Min Consumed Licenses", 
         help_text="Minimum number of consumed licenses"
     )
+    exhausts_within_days = forms.IntegerField(
+        required=False,
+        min_value=0,
+        label="Exhausts Within (days)",
+        help_text="Licenses projected to run out of seats within this many days"
+    )
+    forecast_confidence__gte = forms.DecimalField(
+        required=False,
+        min_value=0,
+        max_value=1,
+        label="Min Forecast Confidence",
+        help_text="Minimum forecast confidence (0-1)"
+    )
+    metadata_has_key = forms.CharField(
+        required=False,
+        label="Metadata Key",
+        help_text="Licenses whose metadata has this top-level key"
+    )
+    metadata_path = forms.CharField(
+        required=False,
+        label="Metadata Path",
+        help_text="key.path=value, e.g. service_plans=EXCHANGE_S_ENTERPRISE"
+    )
+    metadata_contains = forms.JSONField(
+        required=False,
+        label="Metadata Contains",
+        help_text='JSON the metadata must contain, e.g. {"features": ["sso"]}'
+    )
     
     class Meta:
         model = License
         fields = []
+
+
+class ExchangeRateFilterSet(NetBoxModelFilterSet):
+    currency = django_filters.MultipleChoiceFilter(choices=CurrencyChoices)
+    effective_date__gte = django_filters.DateFilter(field_name='effective_date', lookup_expr='gte')
+    effective_date__lte = django_filters.DateFilter(field_name='effective_date', lookup_expr='lte')
+
+    class Meta:
+        model = ExchangeRate
+        fields = ('id', 'currency', 'effective_date')
+
+    def search(self, queryset, name, value):
+        if not value.strip():
+            return queryset
+        return queryset.filter(currency__iexact=value.strip())
+
+
+class ExchangeRateFilterForm(NetBoxModelFilterSetForm):
+    model = ExchangeRate
+
+    currency = forms.MultipleChoiceField(
+        choices=CurrencyChoices,
+        required=False
+    )
+    effective_date__gte = forms.DateField(
+        required=False,
+        label="Effective from (after)",
+        widget=forms.DateInput(attrs={'type': 'date'}),
+    )
+    effective_date__lte = forms.DateField(
+        required=False,
+        label="Effective from (before)",
+        widget=forms.DateInput(attrs={'type': 'date'}),
+    )
+
+    class Meta:
+        model = ExchangeRate
+        fields = []
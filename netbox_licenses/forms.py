@@ -4,7 +4,7 @@ from django import forms
 from django.forms import DateInput, NumberInput, IntegerField, DateField, ModelChoiceField, HiddenInput, CharField, ChoiceField, DecimalField, Textarea, BooleanField
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
-from .models import License, LicenseInstance
+from .models import ExchangeRate, License, LicenseInstance
 from .choices import CurrencyChoices
 from tenancy.models import Contact, Tenant
 from dcim.models import Manufacturer
@@ -290,6 +290,17 @@ class LicenseInstanceForm(NetBoxModelForm):
         return instance
 
 
+class ExchangeRateForm(NetBoxModelForm):
+    comments = CommentField()
+
+    class Meta:
+        model = ExchangeRate
+        fields = ('currency', 'rate_to_nok', 'effective_date', 'comments', 'tags')
+        widgets = {
+            'effective_date': DateInput(attrs={'type': 'date'}),
+        }
+
+
 class QuantitySelectionForm(forms.Form):
     """Simple form to select quantity for bulk creation"""
     quantity = forms.IntegerField(
@@ -0,0 +1,26 @@
+from typing import List
+
+import strawberry
+import strawberry_django
+
+from .types import *
+
+
+@strawberry.type(name="Query")
+class NetBoxLicensesQuery:
+    license: LicenseType = strawberry_django.field()
+    license_list: List[LicenseType] = strawberry_django.field()
+
+    license_instance: LicenseInstanceType = strawberry_django.field()
+    license_instance_list: List[LicenseInstanceType] = strawberry_django.field()
+
+    license_alert: LicenseAlertType = strawberry_django.field()
+    license_alert_list: List[LicenseAlertType] = strawberry_django.field()
+
+    license_renewal: LicenseRenewalType = strawberry_django.field()
+    license_renewal_list: List[LicenseRenewalType] = strawberry_django.field()
+
+
+schema = [
+    NetBoxLicensesQuery,
+]
@@ -0,0 +1,57 @@
+from decimal import Decimal
+from typing import Annotated, List, Union
+
+import strawberry
+import strawberry_django
+from netbox.graphql.types import NetBoxObjectType
+
+from .. import models
+
+__all__ = (
+    'LicenseAlertType',
+    'LicenseInstanceType',
+    'LicenseRenewalType',
+    'LicenseType',
+)
+
+
+# Relations are resolved through NetBox's query optimizer, which turns every
+# nested list into one prefetch query per level instead of one per parent row.
+
+@strawberry_django.type(models.License, fields='__all__')
+class LicenseType(NetBoxObjectType):
+    vendor: Annotated["ManufacturerType", strawberry.lazy('dcim.graphql.types')]
+    tenant: Annotated["TenantType", strawberry.lazy('tenancy.graphql.types')]
+    assignment_type: Annotated["ContentTypeType", strawberry.lazy('netbox.graphql.types')]
+    monthly_price: Decimal
+
+    instances: List[Annotated["LicenseInstanceType", strawberry.lazy('netbox_licenses.graphql.types')]]
+    alerts: List[Annotated["LicenseAlertType", strawberry.lazy('netbox_licenses.graphql.types')]]
+    renewals: List[Annotated["LicenseRenewalType", strawberry.lazy('netbox_licenses.graphql.types')]]
+
+
+@strawberry_django.type(models.LicenseInstance, fields='__all__')
+class LicenseInstanceType(NetBoxObjectType):
+    license: Annotated["LicenseType", strawberry.lazy('netbox_licenses.graphql.types')]
+    assigned_object_type: Annotated["ContentTypeType", strawberry.lazy('netbox.graphql.types')]
+
+    # Prefetched with one query per assigned content type across all instances
+    @strawberry_django.field(prefetch_related=['assigned_object'])
+    def assigned_object(self) -> Annotated[Union[
+        Annotated["ContactType", strawberry.lazy('tenancy.graphql.types')],
+        Annotated["DeviceType", strawberry.lazy('dcim.graphql.types')],
+        Annotated["ServiceType", strawberry.lazy('ipam.graphql.types')],
+        Annotated["TenantType", strawberry.lazy('tenancy.graphql.types')],
+        Annotated["VirtualMachineType", strawberry.lazy('virtualization.graphql.types')],
+    ], strawberry.union("LicenseInstanceAssignmentType")] | None:
+        return self.assigned_object
+
+
+@strawberry_django.type(models.LicenseAlert, fields='__all__')
+class LicenseAlertType(NetBoxObjectType):
+    license: Annotated["LicenseType", strawberry.lazy('netbox_licenses.graphql.types')]
+
+
+@strawberry_django.type(models.LicenseRenewal, fields='__all__')
+class LicenseRenewalType(NetBoxObjectType):
+    license: Annotated["LicenseType", strawberry.lazy('netbox_licenses.graphql.types')]
@@ -0,0 +1,186 @@
+"""
+Query and timing instrumentation for plugin views and services.
+
+Each measured call records the number of SQL queries, time spent in the
+database, time spent in Python and the number of rows the queries returned
+or touched. Results are logged to the ``netbox_licenses.instrumentation``
+logger with the figures attached as ``extra={'instrumentation': {...}}``.
+
+Views are measured by InstrumentationMiddleware, which only acts on requests
+routed to this plugin's UI and API URLs and, when DEBUG is on (or the
+``instrumentation_header`` setting is set), adds an X-License-Instrumentation
+response header. Service classes are measured with the @instrumented class
+decorator.
+
+Query budgets come from the ``query_budgets`` plugin setting, keyed by URL
+name (``plugins:netbox_licenses:dashboard``) or ``Service.method``; a view
+class may also declare a ``query_budget`` attribute. Exceeding a budget logs
+a warning and issues a QueryBudgetExceeded warning, which test runs can turn
+into errors with ``-W error::netbox_licenses.instrumentation.QueryBudgetExceeded``.
+"""
+import functools
+import logging
+import time
+import warnings
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connection
+from netbox.plugins import get_plugin_config
+
+logger = logging.getLogger('netbox_licenses.instrumentation')
+
+INSTRUMENTATION_HEADER = 'X-License-Instrumentation'
+
+PLUGIN_NAMESPACES = ('netbox_licenses', 'netbox_licenses-api')
+
+
+class QueryBudgetExceeded(UserWarning):
+    pass
+
+
+class Measurement:
+    """Query counters for one instrumented call, installed as a connection execute wrapper"""
+
+    def __init__(self, name, query_budget=None):
+        self.name = name
+        self.query_budget = query_budget
+        self.queries = 0
+        self.rows = 0
+        self.sql_time = 0.0
+        self.total_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.queries += 1
+            # -1 for statements without a row count (and for server-side cursors)
+            rowcount = getattr(context['cursor'], 'rowcount', -1)
+            if rowcount > 0:
+                self.rows += rowcount
+
+    @property
+    def python_time(self):
+        return max(self.total_time - self.sql_time, 0.0)
+
+    @property
+    def over_budget(self):
+        return self.query_budget is not None and self.queries > self.query_budget
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'queries': self.queries,
+            'query_budget': self.query_budget,
+            'sql_ms': round(self.sql_time * 1000, 2),
+            'python_ms': round(self.python_time * 1000, 2),
+            'total_ms': round(self.total_time * 1000, 2),
+            'rows': self.rows,
+        }
+
+    def header_value(self):
+        return (
+            f'queries={self.queries}; sql={self.sql_time * 1000:.1f}ms; '
+            f'python={self.python_time * 1000:.1f}ms; rows={self.rows}'
+        )
+
+    def report(self):
+        data = self.as_dict()
+        logger.info(
+            '%(name)s queries=%(queries)d sql_ms=%(sql_ms).2f python_ms=%(python_ms).2f rows=%(rows)d',
+            data,
+            extra={'instrumentation': data},
+        )
+        if self.over_budget:
+            message = f'{self.name} ran {self.queries} queries (budget {self.query_budget})'
+            logger.warning(message, extra={'instrumentation': data})
+            warnings.warn(message, QueryBudgetExceeded, stacklevel=3)
+
+
+def instrumentation_enabled() -> bool:
+    return bool(get_plugin_config('netbox_licenses', 'instrumentation', True))
+
+
+def get_query_budget(name, default=None):
+    budgets = get_plugin_config('netbox_licenses', 'query_budgets', None) or {}
+    return budgets.get(name, default)
+
+
+@contextmanager
+def measure(name, query_budget=None):
+    """Measure everything run inside the block; the Measurement is reported on exit"""
+    measurement = Measurement(name, query_budget)
+    started = time.perf_counter()
+    try:
+        with connection.execute_wrapper(measurement):
+            yield measurement
+    finally:
+        measurement.total_time = time.perf_counter() - started
+        measurement.report()
+
+
+def instrument(name=None):
+    """Function decorator measuring each call under ``name`` (default: the qualified name)"""
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not instrumentation_enabled():
+                return func(*args, **kwargs)
+            with measure(label, get_query_budget(label)):
+                return func(*args, **kwargs)
+
+        return wrapper
+    return decorator
+
+
+def instrumented(cls):
+    """Class decorator instrumenting the public static and class methods of a service class"""
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith('_'):
+            continue
+        if isinstance(value, (staticmethod, classmethod)):
+            wrapped = instrument(f'{cls.__name__}.{attr}')(value.__func__)
+            setattr(cls, attr, type(value)(wrapped))
+    return cls
+
+
+class InstrumentationMiddleware:
+    """Measure requests handled by this plugin's views and API endpoints"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        stack = getattr(request, '_license_instrumentation', None)
+        if stack is None:
+            return response
+
+        measurement = stack.measurement
+        stack.close()
+        if settings.DEBUG or get_plugin_config('netbox_licenses', 'instrumentation_header', False):
+            response[INSTRUMENTATION_HEADER] = measurement.header_value()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if match is None or not set(PLUGIN_NAMESPACES) & set(match.namespaces):
+            return None
+        if not instrumentation_enabled():
+            return None
+
+        view_class = getattr(view_func, 'view_class', None) or getattr(view_func, 'cls', None)
+        name = match.view_name
+        budget = get_query_budget(name, getattr(view_class, 'query_budget', None))
+
+        # Opened here, once the view is known, and closed in __call__ after the response is built
+        stack = ExitStack()
+        stack.measurement = stack.enter_context(measure(name, budget))
+        request._license_instrumentation = stack
+        return None
@@ -0,0 +1,26 @@
+"""
+Management command filling in the denormalized assigned object fields of license instances
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from netbox_licenses.services import LicenseInstanceBulkService
+
+
+class Command(BaseCommand):
+    help = 'Recompute the assigned object name and type shown for every license instance'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows per bulk update for objects resolved in Python (default: 5000)',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        updated = LicenseInstanceBulkService.backfill_assignment_display(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"🔗 Refreshed assignment names on {updated} license instances ({time.monotonic() - started:.1f}s)"
+        ))
@@ -0,0 +1,243 @@
+"""
+Management command timing plugin views, API endpoints, webhooks and services
+"""
+import json
+import statistics
+import warnings
+
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from netbox_licenses.instrumentation import QueryBudgetExceeded, get_query_budget, measure
+from netbox_licenses.models import License, LicenseInstance, VendorIntegration
+from netbox_licenses.services import (
+    AnalyticsService, ComplianceMonitoringService, CostAllocationService, LicenseLifecycleService,
+)
+
+UI = 'plugins:netbox_licenses:'
+API = 'plugins-api:netbox_licenses-api:'
+
+# (URL name, query string, default query budget). Budgets are fixed ceilings that
+# hold at any data volume, so a per-row query shows up as soon as the data grows.
+# None means the case is timed but has no budget (exports query once per chunk).
+VIEW_CASES = (
+    (UI + 'dashboard', '', 40),
+    (UI + 'license_list', '', 40),
+    (UI + 'licenseinstance_list', '', 40),
+    (UI + 'utilization_report', '', 40),
+    (UI + 'vendor_utilization', '', 40),
+    (UI + 'license_analytics', '', 40),
+    (UI + 'compliance_monitoring', '', 40),
+    (UI + 'cost_allocation', '', 40),
+    (UI + 'assigned_object_costs', '', 40),
+    (UI + 'license_renewals', '', 40),
+    (UI + 'vendor_sync_status', '', 40),
+    (API + 'license-list', '', 25),
+    (API + 'license-list', 'pagination=keyset', 25),
+    (API + 'license-trends', '', 25),
+    (API + 'license-savings', '', 25),
+    (API + 'license-savings', 'page=2&per_page=100', 25),
+    (API + 'licenseinstance-list', '', 25),
+    (API + 'licenseinstance-list', 'pagination=keyset', 25),
+    (API + 'licenseinstance-list', 'expand=assigned_object', 30),
+    (API + 'licenseinstance-expiry-timeline', '', 25),
+    (API + 'licenseinstance-expiry-timeline', 'interval=week&months=6', 25),
+    (API + 'exchangerate-list', '', 25),
+    (API + 'license-export', 'export_format=ndjson', None),
+    (API + 'licenseinstance-export', 'export_format=csv', None),
+)
+
+# Generic webhook events posted to the first active generic_api integration
+WEBHOOK_EVENTS = ('license_assigned', 'license_released', 'license_expired')
+WEBHOOK_QUERY_BUDGET = 15
+
+
+def service_cases():
+    """(name, callable, default query budget) for the service entry points
+
+    The lifecycle and compliance checks still query per license or instance,
+    and the rollup and month-close writes issue one insert per batch, so
+    those are timed without a budget.
+    """
+    month = timezone.localdate().replace(day=1) - relativedelta(months=1)
+    return (
+        ('LicenseLifecycleService.check_expiring_licenses',
+         lambda: list(LicenseLifecycleService.check_expiring_licenses(60)), 5),
+        ('ComplianceMonitoringService.run_compliance_checks', ComplianceMonitoringService.run_compliance_checks, None),
+        ('AnalyticsService.record_license_metrics', AnalyticsService.record_license_metrics, 50),
+        ('AnalyticsService.rollup_metrics', AnalyticsService.rollup_metrics, None),
+        ('AnalyticsService.get_portfolio_trends', AnalyticsService.get_portfolio_trends, 10),
+        ('AnalyticsService.forecast_capacity_exhaustion', AnalyticsService.forecast_capacity_exhaustion, 50),
+        ('AnalyticsService.get_savings_opportunities', AnalyticsService.get_savings_opportunities, 10),
+        ('CostAllocationService.get_allocation_costs',
+         lambda: list(CostAllocationService.get_allocation_costs(month)), 10),
+        ('CostAllocationService.close_month', lambda: CostAllocationService.close_month(month), None),
+    )
+
+
+class Command(BaseCommand):
+    help = 'Benchmark plugin views, API endpoints, webhooks and services against query budgets'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            help='Username to run the view benchmarks as (default: first active superuser)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Runs per case; timings are the median (default: 3)',
+        )
+        parser.add_argument(
+            '--only',
+            help='Run only cases whose name contains this text',
+        )
+        parser.add_argument(
+            '--skip-services',
+            action='store_true',
+            help='Do not benchmark the service entry points',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the results as JSON instead of a table',
+        )
+
+    def handle(self, *args, **options):
+        self.repeat = max(options['repeat'], 1)
+        self.only = options['only']
+        self.results = []
+
+        self.stdout.write(
+            f"Benchmarking with {License.objects.count()} licenses and "
+            f"{LicenseInstance.objects.count()} license instances"
+        )
+
+        client = Client(HTTP_HOST=self._host())
+        client.force_login(self._get_user(options['user']))
+
+        for url_name, query, budget in VIEW_CASES:
+            url = reverse(url_name) + (f'?{query}' if query else '')
+            self._run(url, budget, lambda: self._get(client, url), budget_key=url_name)
+
+        self._run_webhooks(client)
+
+        if not options['skip_services']:
+            for name, func, budget in service_cases():
+                self._run(name, budget, func)
+
+        self._print_results(options['json'])
+
+        failures = [result for result in self.results if result['over_budget']]
+        if failures:
+            raise CommandError(
+                'Query budget exceeded: ' + ', '.join(
+                    f"{result['name']} ({result['queries']} > {result['query_budget']})" for result in failures
+                )
+            )
+
+    @staticmethod
+    def _host():
+        hosts = [host.lstrip('.') for host in settings.ALLOWED_HOSTS if host != '*']
+        return hosts[0] if hosts else 'localhost'
+
+    @staticmethod
+    def _get_user(username):
+        User = get_user_model()
+        if username:
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f'User "{username}" does not exist')
+        user = User.objects.filter(is_superuser=True, is_active=True).order_by('pk').first()
+        if user is None:
+            raise CommandError('No active superuser found; pass --user')
+        return user
+
+    @staticmethod
+    def _get(client, url):
+        response = client.get(url)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        if response.status_code >= 400:
+            raise CommandError(f'GET {url} returned {response.status_code}')
+        return response
+
+    def _run_webhooks(self, client):
+        integration = VendorIntegration.objects.filter(
+            integration_type='generic_api', is_active=True
+        ).select_related('vendor').first()
+        license = License.objects.filter(
+            vendor=getattr(integration, 'vendor', None), external_id__isnull=False
+        ).first()
+        if integration is None or license is None:
+            self.stdout.write(self.style.WARNING(
+                'Skipping webhooks: no active generic_api integration with a licensed vendor (see license_seed)'
+            ))
+            return
+
+        url = reverse(UI + 'vendor_webhook', kwargs={'vendor_slug': integration.vendor.slug})
+        for event in WEBHOOK_EVENTS:
+            payload = json.dumps({
+                'event_type': event,
+                'license_id': license.external_id,
+                'user_id': 'benchmark',
+                'expiration_date': timezone.localdate().isoformat(),
+            })
+            self._run(
+                f'webhook {event}', WEBHOOK_QUERY_BUDGET,
+                lambda: client.post(url, payload, content_type='application/json'),
+                budget_key='plugins:netbox_licenses:vendor_webhook',
+            )
+
+    def _run(self, name, budget, func, budget_key=None):
+        if self.only and self.only not in name:
+            return
+
+        budget = get_query_budget(budget_key or name, budget)
+        measurements = []
+        for _ in range(self.repeat):
+            # Every run is rolled back so write paths see the same data each time
+            with transaction.atomic(), warnings.catch_warnings():
+                warnings.simplefilter('ignore', QueryBudgetExceeded)
+                with measure(f'benchmark {name}', budget) as measurement:
+                    func()
+                transaction.set_rollback(True)
+            measurements.append(measurement)
+
+        # Budgets apply to the worst run: the first one usually misses the report cache
+        worst = max(measurements, key=lambda m: m.queries)
+        self.results.append({
+            'name': name,
+            'queries': worst.queries,
+            'query_budget': budget,
+            'over_budget': worst.over_budget,
+            'rows': worst.rows,
+            'sql_ms': round(statistics.median(m.sql_time for m in measurements) * 1000, 1),
+            'python_ms': round(statistics.median(m.python_time for m in measurements) * 1000, 1),
+            'total_ms': round(statistics.median(m.total_time for m in measurements) * 1000, 1),
+        })
+
+    def _print_results(self, as_json):
+        if as_json:
+            self.stdout.write(json.dumps(self.results, indent=2))
+            return
+
+        width = max((len(result['name']) for result in self.results), default=10)
+        self.stdout.write(
+            f"{'case':<{width}}  {'queries':>7}  {'budget':>6}  {'sql ms':>9}  {'python ms':>9}  "
+            f"{'total ms':>9}  {'rows':>9}"
+        )
+        for result in self.results:
+            line = (
+                f"{result['name']:<{width}}  {result['queries']:>7}  {str(result['query_budget'] or '-'):>6}  "
+                f"{result['sql_ms']:>9.1f}  {result['python_ms']:>9.1f}  {result['total_ms']:>9.1f}  "
+                f"{result['rows']:>9}"
+            )
+            self.stdout.write(self.style.ERROR(line) if result['over_budget'] else line)
@@ -0,0 +1,73 @@
+"""
+Management command for month-close license chargeback
+"""
+from datetime import datetime
+
+from dateutil.relativedelta import relativedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from netbox_licenses.services import CostAllocationService
+
+
+def parse_month(value):
+    try:
+        return datetime.strptime(value, '%Y-%m').date()
+    except ValueError:
+        raise CommandError(f'Invalid month "{value}", expected YYYY-MM')
+
+
+class Command(BaseCommand):
+    help = 'Close monthly license chargeback into the ledger for every allocation target'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--month',
+            help='Month to close as YYYY-MM (default: previous month)',
+        )
+        parser.add_argument(
+            '--from',
+            dest='from_month',
+            help='First month of a backfill range (YYYY-MM)',
+        )
+        parser.add_argument(
+            '--to',
+            dest='to_month',
+            help='Last month of a backfill range (YYYY-MM, default: previous month)',
+        )
+        parser.add_argument(
+            '--report',
+            action='store_true',
+            help='Print per-target totals for each month after closing',
+        )
+
+    def handle(self, *args, **options):
+        previous_month = timezone.localdate().replace(day=1) - relativedelta(months=1)
+
+        if options['from_month']:
+            month = parse_month(options['from_month'])
+            last = parse_month(options['to_month']) if options['to_month'] else previous_month
+        else:
+            month = parse_month(options['month']) if options['month'] else previous_month
+            last = month
+
+        if month > last:
+            raise CommandError('--from must not be after --to')
+        if last > previous_month:
+            raise CommandError(f'Only months that have ended can be closed (latest: {previous_month:%Y-%m})')
+
+        closed = CostAllocationService.close_months(month, last)
+
+        while month <= last:
+            if month in closed:
+                self.stdout.write(self.style.SUCCESS(f"📒 {month:%Y-%m}: {closed[month]} chargeback entries recorded"))
+            else:
+                self.stdout.write(self.style.WARNING(f"⏭️  Chargeback for {month:%Y-%m} is already closed"))
+
+            if options['report']:
+                for row in CostAllocationService.get_chargeback_report(month):
+                    self.stdout.write(
+                        f"    {row['allocation_target']} ({row['allocation_type']}): "
+                        f"{row['total_cost']:,.2f} NOK across {row['license_count']} licenses"
+                    )
+
+            month += relativedelta(months=1)
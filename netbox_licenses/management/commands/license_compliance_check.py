@@ -1,6 +1,8 @@
 """
 Management command for automated license compliance monitoring
 """
+import time
+
 from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
 from netbox_licenses.services import ComplianceMonitoringService, LicenseLifecycleService, AnalyticsService
@@ -20,6 +22,22 @@ class Command(BaseCommand):
             action='store_true', 
             help='Record analytics metrics for trend analysis',
         )
+        parser.add_argument(
+            '--rollup-metrics',
+            action='store_true',
+            help='Refresh the hourly, daily and monthly analytics rollups',
+        )
+        parser.add_argument(
+            '--forecast-capacity',
+            action='store_true',
+            help='Project seat exhaustion dates for every license',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows per bulk insert when recording metrics (default: 5000)',
+        )
         parser.add_argument(
             '--underutilized-threshold',
             type=int,
@@ -52,8 +70,24 @@ class Command(BaseCommand):
             
             # Record analytics metrics if requested
             if options['record_metrics']:
-                metrics_recorded = AnalyticsService.record_license_metrics()
-                self.stdout.write(f"📊 Analytics metrics recorded: {metrics_recorded}")
+                started = time.monotonic()
+                metrics_recorded = AnalyticsService.record_license_metrics(batch_size=options['batch_size'])
+                elapsed = time.monotonic() - started
+                rate = metrics_recorded / elapsed if elapsed > 0 else 0
+                self.stdout.write(
+                    f"📊 Analytics metrics recorded: {metrics_recorded} in {elapsed:.2f}s ({rate:,.0f} rows/s)"
+                )
+
+            # Refresh analytics rollups if requested
+            if options['rollup_metrics']:
+                rollups = AnalyticsService.rollup_metrics(batch_size=options['batch_size'])
+                for tier, written in rollups.items():
+                    self.stdout.write(f"🗜️  {tier.title()} rollup buckets written: {written}")
+            
+            # Refresh capacity forecasts if requested
+            if options['forecast_capacity']:
+                forecasts = AnalyticsService.forecast_capacity_exhaustion()
+                self.stdout.write(f"🔮 Capacity forecasts updated: {forecasts}")
             
             # Summary
             total_alerts = (
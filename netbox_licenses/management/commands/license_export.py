@@ -0,0 +1,187 @@
+"""
+Management command for columnar Parquet snapshots of license data
+"""
+import os
+import time
+from itertools import groupby
+
+from django.core.management.base import BaseCommand, CommandError
+from netbox_licenses.exports import (
+    LICENSE_EXPORT_COLUMNS, LICENSE_INSTANCE_EXPORT_COLUMNS, iter_chunks, resolve_assigned_objects,
+)
+from netbox_licenses.models import License, LicenseInstance, LicenseAnalytics, LicenseAlert
+
+EXPORT_TABLES = ('licenses', 'instances', 'analytics', 'alerts')
+
+ANALYTICS_EXPORT_COLUMNS = (
+    ('id', 'id'),
+    ('license_id', 'license_id'),
+    ('metric_type', 'metric_type'),
+    ('metric_value', 'metric_value'),
+    ('timestamp', 'timestamp'),
+)
+
+ALERT_EXPORT_COLUMNS = (
+    ('id', 'id'),
+    ('license_id', 'license_id'),
+    ('alert_type', 'alert_type'),
+    ('severity', 'severity'),
+    ('status', 'status'),
+    ('title', 'title'),
+    ('triggered_at', 'triggered_at'),
+    ('acknowledged_at', 'acknowledged_at'),
+    ('resolved_at', 'resolved_at'),
+    ('notifications_sent', 'notifications_sent'),
+)
+
+
+def table_specs(pa):
+    """Queryset, columns, tenant lookup and Arrow schema for each exportable table"""
+    timestamp = pa.timestamp('us', tz='UTC')
+
+    return {
+        'licenses': (
+            License.objects.all(),
+            LICENSE_EXPORT_COLUMNS,
+            'tenant_id',
+            pa.schema([
+                ('id', pa.int64()), ('name', pa.string()), ('vendor', pa.string()), ('tenant', pa.string()),
+                ('external_id', pa.string()), ('total_licenses', pa.int64()), ('consumed_licenses', pa.int64()),
+                ('price', pa.decimal128(10, 2)), ('currency', pa.string()), ('billing_cycle', pa.string()),
+                ('monthly_price', pa.decimal128(14, 4)), ('auto_renew', pa.bool_()),
+                ('forecast_exhaustion_date', pa.date32()), ('created', timestamp), ('last_updated', timestamp),
+                ('tenant_id', pa.int64()),
+            ]),
+        ),
+        'instances': (
+            LicenseInstance.objects.all(),
+            LICENSE_INSTANCE_EXPORT_COLUMNS,
+            'license__tenant_id',
+            pa.schema([
+                ('id', pa.int64()), ('license_id', pa.int64()), ('license', pa.string()), ('vendor', pa.string()),
+                ('assigned_object_type_id', pa.int64()), ('assigned_object_id', pa.int64()),
+                ('nok_price_override', pa.decimal128(10, 2)), ('start_date', pa.date32()),
+                ('end_date', pa.date32()), ('auto_renew', pa.bool_()), ('created', timestamp),
+                ('last_updated', timestamp), ('tenant_id', pa.int64()),
+                ('assigned_object_type', pa.string()), ('assigned_object', pa.string()),
+            ]),
+        ),
+        'analytics': (
+            LicenseAnalytics.objects.all(),
+            ANALYTICS_EXPORT_COLUMNS,
+            'license__tenant_id',
+            pa.schema([
+                ('id', pa.int64()), ('license_id', pa.int64()), ('metric_type', pa.string()),
+                ('metric_value', pa.decimal128(12, 2)), ('timestamp', timestamp), ('tenant_id', pa.int64()),
+            ]),
+        ),
+        'alerts': (
+            LicenseAlert.objects.all(),
+            ALERT_EXPORT_COLUMNS,
+            'license__tenant_id',
+            pa.schema([
+                ('id', pa.int64()), ('license_id', pa.int64()), ('alert_type', pa.string()),
+                ('severity', pa.string()), ('status', pa.string()), ('title', pa.string()),
+                ('triggered_at', timestamp), ('acknowledged_at', timestamp), ('resolved_at', timestamp),
+                ('notifications_sent', pa.int64()), ('tenant_id', pa.int64()),
+            ]),
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Write licenses, instances, analytics and alerts as Parquet files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default='license_export',
+            help='Directory to write the Parquet files to (default: license_export)',
+        )
+        parser.add_argument(
+            '--tables',
+            nargs='+',
+            choices=EXPORT_TABLES,
+            default=list(EXPORT_TABLES),
+            help='Tables to export (default: all)',
+        )
+        parser.add_argument(
+            '--partition-by-tenant',
+            action='store_true',
+            help='Write one tenant_id=<id> directory per tenant for each table',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50000,
+            help='Rows per record batch / row group (default: 50000)',
+        )
+        parser.add_argument(
+            '--compression',
+            default='zstd',
+            help='Parquet compression codec (default: zstd)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise CommandError(
+                'pyarrow is required for Parquet export; install it with "pip install netbox_licenses[parquet]"'
+            )
+
+        specs = table_specs(pa)
+        for table in options['tables']:
+            queryset, columns, tenant_lookup, schema = specs[table]
+            started = time.monotonic()
+            rows, files = self._export_table(
+                pa, pq, table, queryset, columns, tenant_lookup, schema, options
+            )
+            elapsed = time.monotonic() - started
+            self.stdout.write(self.style.SUCCESS(
+                f"📦 {table}: {rows} rows in {files} file(s) ({elapsed:.1f}s)"
+            ))
+
+    def _export_table(self, pa, pq, table, queryset, columns, tenant_lookup, schema, options):
+        columns = columns + (('tenant_id', tenant_lookup),)
+        partitioned = options['partition_by_tenant']
+        # Partitioned exports are read in tenant order so only one file is open at a time
+        ordering = (tenant_lookup, 'pk') if partitioned else ('pk',)
+
+        writer = None
+        current_path = None
+        rows_written = 0
+        files = 0
+
+        try:
+            for chunk in iter_chunks(queryset, columns, options['batch_size'], ordering=ordering):
+                if table == 'instances':
+                    resolve_assigned_objects(chunk)
+
+                groups = groupby(chunk, key=lambda row: row['tenant_id']) if partitioned else [(None, chunk)]
+                for tenant_id, group in groups:
+                    path = self._output_path(options['output'], table, tenant_id if partitioned else None, partitioned)
+                    if path != current_path:
+                        if writer is not None:
+                            writer.close()
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                        writer = pq.ParquetWriter(path, schema, compression=options['compression'])
+                        current_path = path
+                        files += 1
+
+                    batch = pa.RecordBatch.from_pylist(list(group), schema=schema)
+                    writer.write_batch(batch)
+                    rows_written += batch.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+
+        return rows_written, files
+
+    @staticmethod
+    def _output_path(output, table, tenant_id, partitioned):
+        if partitioned:
+            partition = 'tenant_id=__null__' if tenant_id is None else f'tenant_id={tenant_id}'
+            return os.path.join(output, table, partition, 'part-0.parquet')
+        return os.path.join(output, f'{table}.parquet')
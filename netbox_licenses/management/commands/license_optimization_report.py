@@ -5,7 +5,6 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from netbox_licenses.services import AnalyticsService, CostAllocationService
 from netbox_licenses.models import License
-from decimal import Decimal
 
 
 class Command(BaseCommand):
@@ -24,6 +23,17 @@ class Command(BaseCommand):
             default=100.0,
             help='Minimum potential savings to include in report (default: 100 NOK)',
         )
+        parser.add_argument(
+            '--page',
+            type=int,
+            help='Only report this page of ranked opportunities (default: all pages)',
+        )
+        parser.add_argument(
+            '--per-page',
+            type=int,
+            default=500,
+            help='Opportunities fetched per page (default: 500)',
+        )
         
     def handle(self, *args, **options):
         self.stdout.write(
@@ -32,18 +42,18 @@ class Command(BaseCommand):
             )
         )
         
-        # Get optimization recommendations
-        recommendations = AnalyticsService.get_cost_optimization_recommendations()
-        
-        # Filter by minimum savings
-        min_savings = Decimal(str(options['min_savings']))
-        filtered_recommendations = [
-            rec for rec in recommendations 
-            if rec['potential_savings'] >= float(min_savings)
-        ]
+        # Get ranked optimization opportunities, filtered by minimum savings in the query
+        min_savings = options['min_savings']
+        first_page = AnalyticsService.get_savings_opportunities(
+            page=options['page'] or 1, per_page=options['per_page'], min_savings=min_savings
+        )
+        if options['page']:
+            filtered_recommendations = first_page['results']
+        else:
+            filtered_recommendations = list(self._iter_opportunities(first_page, min_savings))
         
         # Calculate totals
-        total_potential_savings = sum(rec['potential_savings'] for rec in filtered_recommendations)
+        total_potential_savings = first_page['total_potential_savings']
         total_licenses_reviewed = License.objects.count()
         
         # Output results
@@ -54,6 +64,17 @@ class Command(BaseCommand):
         elif options['format'] == 'csv':
             self._output_csv_report(filtered_recommendations)
     
+    def _iter_opportunities(self, first_page, min_savings):
+        """Yield every ranked opportunity, fetching one page at a time"""
+        opportunities = first_page
+        while True:
+            yield from opportunities['results']
+            if opportunities['page'] >= opportunities['num_pages']:
+                break
+            opportunities = AnalyticsService.get_savings_opportunities(
+                page=opportunities['page'] + 1, per_page=opportunities['per_page'], min_savings=min_savings
+            )
+    
     def _output_text_report(self, recommendations, total_savings, total_licenses):
         """Output human-readable text report"""
         self.stdout.write("\n" + "="*80)
@@ -74,13 +95,12 @@ class Command(BaseCommand):
         self.stdout.write("-" * 80)
         
         for i, rec in enumerate(recommendations[:10], 1):  # Top 10
-            license = rec['license']
             savings = rec['potential_savings']
             current = rec['current_total']
             recommended = rec['recommended_total']
             
-            self.stdout.write(f"\n{i:2d}. {license.name}")
-            self.stdout.write(f"    Vendor: {license.vendor.name}")
+            self.stdout.write(f"\n{i:2d}. {rec['license_name']}")
+            self.stdout.write(f"    Vendor: {rec['vendor']}")
             self.stdout.write(f"    Current: {current} licenses | Recommended: {recommended} licenses")
             self.stdout.write(f"    💰 Potential savings: {savings:,.2f} NOK")
             
@@ -119,9 +139,9 @@ class Command(BaseCommand):
         
         for rec in recommendations:
             report['recommendations'].append({
-                'license_id': rec['license'].id,
-                'license_name': rec['license'].name,
-                'vendor': rec['license'].vendor.name,
+                'license_id': rec['license_id'],
+                'license_name': rec['license_name'],
+                'vendor': rec['vendor'],
                 'current_total': rec['current_total'],
                 'current_used': rec['current_used'],
                 'recommended_total': rec['recommended_total'],
@@ -145,8 +165,8 @@ class Command(BaseCommand):
         
         for rec in recommendations:
             writer.writerow([
-                rec['license'].name,
-                rec['license'].vendor.name,
+                rec['license_name'],
+                rec['vendor'],
                 rec['current_total'],
                 rec['current_used'],
                 rec['recommended_total'],
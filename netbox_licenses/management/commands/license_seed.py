@@ -0,0 +1,346 @@
+"""
+Management command generating synthetic license data for local load testing
+"""
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+from dcim.models import Device, DeviceRole, DeviceType, Manufacturer, Site
+from tenancy.models import Contact, Tenant
+from virtualization.models import Cluster, ClusterType, VirtualMachine
+from netbox_licenses.caching import bump_data_version
+from netbox_licenses.choices import CurrencyChoices
+from netbox_licenses.models import (
+    ExchangeRate, License, LicenseAlert, LicenseAnalytics, LicenseInstance, VendorIntegration,
+    assigned_object_display_name, assigned_object_type_label, bulk_instance_changes,
+)
+from netbox_licenses.services import LicenseInstanceBulkService
+
+# Counts per scale; individual options override them
+SCALES = {
+    '1k': {
+        'manufacturers': 10, 'tenants': 10, 'licenses': 50, 'instances': 1_000,
+        'devices': 200, 'virtual_machines': 200, 'contacts': 200, 'analytics_days': 30, 'alerts': 50,
+    },
+    '100k': {
+        'manufacturers': 50, 'tenants': 100, 'licenses': 2_000, 'instances': 100_000,
+        'devices': 10_000, 'virtual_machines': 10_000, 'contacts': 10_000, 'analytics_days': 60, 'alerts': 1_000,
+    },
+    '1m': {
+        'manufacturers': 200, 'tenants': 500, 'licenses': 10_000, 'instances': 1_000_000,
+        'devices': 50_000, 'virtual_machines': 50_000, 'contacts': 50_000, 'analytics_days': 90, 'alerts': 5_000,
+    },
+}
+
+SEEDED_METRIC_TYPES = ('utilization', 'consumed', 'cost')
+
+SEED_EXCHANGE_RATES = {
+    CurrencyChoices.EUR: Decimal('11.500000'),
+    CurrencyChoices.SEK: Decimal('1.000000'),
+    CurrencyChoices.USD: Decimal('10.500000'),
+    CurrencyChoices.DKK: Decimal('1.550000'),
+}
+
+ALERT_TYPES = ('expiring', 'overallocated', 'underutilized', 'renewal_due')
+ALERT_SEVERITIES = ('low', 'medium', 'high', 'critical')
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic manufacturers, tenants, licenses, instances, analytics and alerts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            choices=SCALES,
+            default='1k',
+            help='Preset data volume by number of license instances (default: 1k)',
+        )
+        for option in SCALES['1k']:
+            parser.add_argument(
+                f"--{option.replace('_', '-')}",
+                type=int,
+                dest=option,
+                help=f"Number of {option.replace('_', ' ')} (overrides --scale)",
+            )
+        parser.add_argument(
+            '--prefix',
+            default='seed',
+            help='Name prefix identifying generated objects (default: seed)',
+        )
+        parser.add_argument(
+            '--flush',
+            action='store_true',
+            help='Delete objects generated earlier with the same prefix first',
+        )
+        parser.add_argument(
+            '--random-seed',
+            type=int,
+            default=42,
+            help='Random seed for reproducible data (default: 42)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows per bulk insert (default: 5000)',
+        )
+
+    def handle(self, *args, **options):
+        counts = dict(SCALES[options['scale']])
+        counts.update({key: options[key] for key in counts if options.get(key) is not None})
+
+        self.prefix = options['prefix']
+        self.batch_size = options['batch_size']
+        self.rng = random.Random(options['random_seed'])
+        self.today = timezone.localdate()
+
+        if options['flush']:
+            self._flush()
+        elif License.objects.filter(name__startswith=f'{self.prefix}-').exists():
+            raise CommandError(f'Seed data with prefix "{self.prefix}" already exists; use --flush to replace it')
+
+        started = time.monotonic()
+        with transaction.atomic():
+            manufacturers = self._step('manufacturers', self._create_manufacturers, counts['manufacturers'])
+            tenants = self._step('tenants', self._create_tenants, counts['tenants'])
+            targets = {
+                'device': self._step('devices', self._create_devices, counts['devices'], manufacturers[0]),
+                'virtualmachine': self._step(
+                    'virtual machines', self._create_virtual_machines, counts['virtual_machines']
+                ),
+                'contact': self._step('contacts', self._create_contacts, counts['contacts']),
+            }
+            targets = {model: ids for model, ids in targets.items() if ids}
+            if not targets:
+                raise CommandError('At least one of --devices, --virtual-machines or --contacts must be positive')
+
+            self._ensure_exchange_rates()
+            licenses = self._step(
+                'licenses', self._create_licenses, counts['licenses'], counts['instances'],
+                manufacturers, tenants, list(targets)
+            )
+            self._step('license instances', self._create_instances, counts['instances'], licenses, targets)
+            self._step('analytics rows', self._create_analytics, counts['analytics_days'], licenses)
+            self._step('alerts', self._create_alerts, counts['alerts'], licenses)
+
+            bump_data_version(
+                Manufacturer, Tenant, Device, VirtualMachine, Contact,
+                License, LicenseInstance, LicenseAnalytics, LicenseAlert, ExchangeRate,
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"🌱 Seeded {counts['instances']} license instances in {time.monotonic() - started:.1f}s"
+        ))
+
+    def _step(self, label, func, count, *args):
+        started = time.monotonic()
+        result = func(count, *args)
+        self.stdout.write(f"  {label}: {count} ({time.monotonic() - started:.1f}s)")
+        return result
+
+    def _name(self, kind, index):
+        return f'{self.prefix}-{kind}-{index:07d}'
+
+    def _bulk_create(self, model, objects):
+        created = []
+        for batch in batched(objects, self.batch_size):
+            created.extend(obj.pk for obj in model.objects.bulk_create(batch))
+        return created
+
+    def _bulk_create_targets(self, model, objects):
+        """Bulk create assignable objects, returning (pk, display name) pairs"""
+        created = []
+        for batch in batched(objects, self.batch_size):
+            created.extend(
+                (obj.pk, assigned_object_display_name(obj)) for obj in model.objects.bulk_create(batch)
+            )
+        return created
+
+    def _flush(self):
+        prefix = f'{self.prefix}-'
+        licenses = License.objects.filter(name__startswith=prefix)
+        instance_ids = LicenseInstance.objects.filter(license__in=licenses).values_list('pk', flat=True)
+
+        with transaction.atomic(), bulk_instance_changes():
+            # Instances first, in batches, so the cascade from License stays small
+            for batch in batched(instance_ids.iterator(chunk_size=self.batch_size), self.batch_size):
+                LicenseInstance.objects.filter(pk__in=batch).delete()
+            licenses.delete()
+            VirtualMachine.objects.filter(name__startswith=prefix).delete()
+            Device.objects.filter(name__startswith=prefix).delete()
+            Contact.objects.filter(name__startswith=prefix).delete()
+            Cluster.objects.filter(name__startswith=prefix).delete()
+            DeviceType.objects.filter(model__startswith=prefix).delete()
+            Site.objects.filter(name__startswith=prefix).delete()
+            Tenant.objects.filter(name__startswith=prefix).delete()
+            Manufacturer.objects.filter(name__startswith=prefix).delete()
+
+        self.stdout.write(f'🧹 Removed existing "{self.prefix}" seed data')
+
+    def _create_manufacturers(self, count):
+        manufacturers = Manufacturer.objects.bulk_create([
+            Manufacturer(name=self._name('vendor', i), slug=slugify(self._name('vendor', i)))
+            for i in range(count)
+        ])
+        # One generic integration so the webhook endpoint can be exercised
+        VendorIntegration.objects.create(
+            vendor=manufacturers[0], integration_type='generic_api', sync_schedule='manual'
+        )
+        return manufacturers
+
+    def _create_tenants(self, count):
+        return Tenant.objects.bulk_create([
+            Tenant(name=self._name('tenant', i), slug=slugify(self._name('tenant', i)))
+            for i in range(count)
+        ])
+
+    def _create_devices(self, count, manufacturer):
+        if not count:
+            return []
+        site = Site.objects.create(name=self._name('site', 0), slug=slugify(self._name('site', 0)))
+        role, _ = DeviceRole.objects.get_or_create(
+            slug=f'{self.prefix}-role', defaults={'name': f'{self.prefix}-role', 'color': '9e9e9e'}
+        )
+        device_type = DeviceType.objects.create(
+            manufacturer=manufacturer, model=self._name('model', 0), slug=slugify(self._name('model', 0))
+        )
+        return self._bulk_create_targets(Device, (
+            Device(name=self._name('device', i), site=site, role=role, device_type=device_type)
+            for i in range(count)
+        ))
+
+    def _create_virtual_machines(self, count):
+        if not count:
+            return []
+        cluster_type, _ = ClusterType.objects.get_or_create(
+            slug=f'{self.prefix}-cluster-type', defaults={'name': f'{self.prefix}-cluster-type'}
+        )
+        cluster = Cluster.objects.create(name=self._name('cluster', 0), type=cluster_type)
+        return self._bulk_create_targets(VirtualMachine, (
+            VirtualMachine(name=self._name('vm', i), cluster=cluster)
+            for i in range(count)
+        ))
+
+    def _create_contacts(self, count):
+        return self._bulk_create_targets(Contact, (
+            Contact(name=self._name('contact', i))
+            for i in range(count)
+        ))
+
+    def _ensure_exchange_rates(self):
+        existing = set(ExchangeRate.objects.values_list('currency', flat=True).distinct())
+        ExchangeRate.objects.bulk_create([
+            ExchangeRate(currency=currency, rate_to_nok=rate, effective_date=self.today)
+            for currency, rate in SEED_EXCHANGE_RATES.items()
+            if currency not in existing
+        ])
+        ExchangeRate.clear_cache()
+
+    def _create_licenses(self, count, instance_count, manufacturers, tenants, target_models):
+        rng = self.rng
+        content_types = {
+            model: ContentType.objects.get_by_natural_key(app_label, model)
+            for app_label, model in (('dcim', 'device'), ('virtualization', 'virtualmachine'), ('tenancy', 'contact'))
+            if model in target_models
+        }
+        currencies = [CurrencyChoices.NOK] * 3 + list(SEED_EXCHANGE_RATES)
+        cycles = [choice for choice, _ in License.BILLING_CYCLE_CHOICES if choice != 'custom']
+        share = max(instance_count // max(count, 1), 1)
+
+        licenses = []
+        for i in range(count):
+            licenses.append(License(
+                name=self._name('license', i),
+                vendor=rng.choice(manufacturers),
+                tenant=rng.choice(tenants),
+                assignment_type=content_types[target_models[i % len(target_models)]],
+                price=Decimal(rng.randrange(1000, 500000)) / 100,
+                currency=rng.choice(currencies),
+                billing_cycle=rng.choice(cycles),
+                external_id=self._name('sku', i),
+                # Between 60% and 150% of the expected consumption: some over-, some underallocated
+                total_licenses=max(int(share * rng.uniform(0.6, 1.5)), 1),
+                auto_renew=rng.random() < 0.3,
+            ))
+
+        created = []
+        for batch in batched(licenses, self.batch_size):
+            created.extend(License.objects.bulk_create(batch))
+        return created
+
+    def _create_instances(self, count, licenses, targets):
+        rng = self.rng
+        today = self.today
+
+        def instances():
+            for _ in range(count):
+                license = rng.choice(licenses)
+                start_date = today - timedelta(days=rng.randrange(0, 1095))
+                target_id, target_name = rng.choice(targets[license.assignment_type.model])
+                yield LicenseInstance(
+                    license=license,
+                    assigned_object_type_id=license.assignment_type_id,
+                    assigned_object_id=target_id,
+                    assigned_object_name=target_name,
+                    assigned_object_type_name=assigned_object_type_label(license.assignment_type),
+                    start_date=start_date,
+                    end_date=start_date + timedelta(days=365 * rng.randint(1, 3)),
+                )
+
+        with bulk_instance_changes():
+            for batch in batched(instances(), self.batch_size):
+                LicenseInstance.objects.bulk_create(batch)
+        LicenseInstanceBulkService.refresh_consumed_licenses([license.pk for license in licenses])
+
+    def _create_analytics(self, days, licenses):
+        rng = self.rng
+        now = timezone.now()
+
+        # timestamp is auto_now_add, so each day is inserted and then moved back in time
+        for day in range(days, 0, -1):
+            rows = []
+            for license in licenses:
+                consumed = max(int(license.total_licenses * rng.uniform(0.3, 1.1)), 0)
+                values = {
+                    'utilization': Decimal(consumed * 100 / license.total_licenses).quantize(Decimal('0.01')),
+                    'consumed': Decimal(consumed),
+                    'cost': (license.price * consumed).quantize(Decimal('0.01')),
+                }
+                rows.extend(
+                    LicenseAnalytics(license=license, metric_type=metric_type, metric_value=values[metric_type])
+                    for metric_type in SEEDED_METRIC_TYPES
+                )
+            pks = self._bulk_create(LicenseAnalytics, rows)
+            LicenseAnalytics.objects.filter(pk__in=pks).update(timestamp=now - timedelta(days=day))
+
+    def _create_alerts(self, count, licenses):
+        rng = self.rng
+
+        def alerts():
+            for i in range(count):
+                license = rng.choice(licenses)
+                alert_type = rng.choice(ALERT_TYPES)
+                yield LicenseAlert(
+                    license=license,
+                    alert_type=alert_type,
+                    severity=rng.choice(ALERT_SEVERITIES),
+                    status='active' if rng.random() < 0.7 else 'resolved',
+                    title=f'{alert_type} alert for {license.name}',
+                    message=f'Synthetic {alert_type} alert #{i}',
+                    alert_data={'source': self.prefix},
+                )
+
+        self._bulk_create(LicenseAlert, alerts())
@@ -0,0 +1,62 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def rollup_fields():
+    return [
+        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+        ('metric_type', models.CharField(max_length=20)),
+        ('bucket', models.DateTimeField()),
+        ('min_value', models.DecimalField(decimal_places=2, max_digits=12)),
+        ('max_value', models.DecimalField(decimal_places=2, max_digits=12)),
+        ('avg_value', models.DecimalField(decimal_places=4, max_digits=14)),
+        ('last_value', models.DecimalField(decimal_places=2, max_digits=12)),
+        ('sample_count', models.PositiveIntegerField()),
+        ('license', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='netbox_licenses.license')),
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_licenses', '0004_remove_conversion_rate_add_nok_price'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LicenseAnalyticsHourly',
+            fields=rollup_fields(),
+            options={
+                'ordering': ['-bucket'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='LicenseAnalyticsDaily',
+            fields=rollup_fields(),
+            options={
+                'ordering': ['-bucket'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='LicenseAnalyticsMonthly',
+            fields=rollup_fields(),
+            options={
+                'ordering': ['-bucket'],
+                'abstract': False,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='licenseanalyticshourly',
+            constraint=models.UniqueConstraint(fields=('license', 'metric_type', 'bucket'), name='netbox_licenses_licenseanalyticshourly_unique_bucket'),
+        ),
+        migrations.AddConstraint(
+            model_name='licenseanalyticsdaily',
+            constraint=models.UniqueConstraint(fields=('license', 'metric_type', 'bucket'), name='netbox_licenses_licenseanalyticsdaily_unique_bucket'),
+        ),
+        migrations.AddConstraint(
+            model_name='licenseanalyticsmonthly',
+            constraint=models.UniqueConstraint(fields=('license', 'metric_type', 'bucket'), name='netbox_licenses_licenseanalyticsmonthly_unique_bucket'),
+        ),
+    ]
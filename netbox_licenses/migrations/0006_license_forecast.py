@@ -0,0 +1,30 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_licenses', '0005_licenseanalytics_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='license',
+            name='forecast_exhaustion_date',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='license',
+            name='forecast_confidence',
+            field=models.DecimalField(blank=True, decimal_places=3, editable=False, max_digits=4, null=True),
+        ),
+        migrations.AddField(
+            model_name='license',
+            name='forecast_updated',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='license',
+            index=models.Index(fields=['forecast_exhaustion_date'], name='netbox_lice_forecas_026694_idx'),
+        ),
+    ]
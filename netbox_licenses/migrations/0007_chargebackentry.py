@@ -0,0 +1,41 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_licenses', '0006_license_forecast'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChargebackEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                ('month', models.DateField()),
+                ('license_name', models.CharField(max_length=50)),
+                ('allocation_type', models.CharField(max_length=20)),
+                ('allocation_target', models.CharField(max_length=100)),
+                ('percentage', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('license_cost', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('allocated_cost', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('currency', models.CharField(default='NOK', max_length=3)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('allocation', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='chargeback_entries', to='netbox_licenses.costallocation')),
+                ('license', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='chargeback_entries', to='netbox_licenses.license')),
+            ],
+            options={
+                'ordering': ['-month', 'allocation_target'],
+                'verbose_name_plural': 'chargeback entries',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='chargebackentry',
+            constraint=models.UniqueConstraint(fields=('month', 'allocation'), name='unique_chargeback_allocation_month'),
+        ),
+        migrations.AddIndex(
+            model_name='chargebackentry',
+            index=models.Index(fields=['month', 'allocation_target'], name='netbox_lice_month_06b30c_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+import django.contrib.postgres.constraints
+import django.contrib.postgres.indexes
+import django.db.models.expressions
+import netbox_licenses.models
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_licenses', '0007_chargebackentry'),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.AddIndex(
+            model_name='costallocation',
+            index=django.contrib.postgres.indexes.GistIndex(
+                netbox_licenses.models.DateRange(
+                    django.db.models.expressions.F('effective_from'),
+                    django.db.models.expressions.F('effective_to'),
+                    django.db.models.expressions.Value('[]'),
+                ),
+                name='netbox_lice_costall_period_idx',
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='costallocation',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                expressions=[
+                    ('license', '='),
+                    ('allocation_target', '='),
+                    (
+                        netbox_licenses.models.DateRange(
+                            django.db.models.expressions.F('effective_from'),
+                            django.db.models.expressions.F('effective_to'),
+                            django.db.models.expressions.Value('[]'),
+                        ),
+                        '&&',
+                    ),
+                ],
+                index_type='GIST',
+                name='netbox_licenses_costallocation_no_overlap',
+            ),
+        ),
+    ]
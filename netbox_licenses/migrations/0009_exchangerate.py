@@ -0,0 +1,36 @@
+import taggit.managers
+import utilities.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extras', '0129_fix_script_paths'),
+        ('netbox_licenses', '0008_costallocation_period'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExchangeRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                ('created', models.DateTimeField(auto_now_add=True, null=True)),
+                ('last_updated', models.DateTimeField(auto_now=True, null=True)),
+                ('custom_field_data', models.JSONField(blank=True, default=dict, encoder=utilities.json.CustomFieldJSONEncoder)),
+                ('currency', models.CharField(max_length=3)),
+                ('rate_to_nok', models.DecimalField(decimal_places=6, max_digits=12)),
+                ('effective_date', models.DateField()),
+                ('comments', models.TextField(blank=True)),
+                ('tags', taggit.managers.TaggableManager(through='extras.TaggedItem', to='extras.Tag')),
+            ],
+            options={
+                'ordering': ['currency', '-effective_date'],
+            },
+            bases=(models.Model,),
+        ),
+        migrations.AddConstraint(
+            model_name='exchangerate',
+            constraint=models.UniqueConstraint(fields=('currency', 'effective_date'), name='unique_exchange_rate_per_day'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_licenses', '0009_exchangerate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='license',
+            name='monthly_price',
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Case(
+                    models.When(billing_cycle='quarterly', then=models.F('price') / models.Value(Decimal('3'))),
+                    models.When(billing_cycle='yearly', then=models.F('price') / models.Value(Decimal('12'))),
+                    models.When(billing_cycle='one_time', then=models.Value(Decimal('0'))),
+                    default=models.F('price'),
+                    output_field=models.DecimalField(decimal_places=4, max_digits=14),
+                ),
+                output_field=models.DecimalField(decimal_places=4, max_digits=14),
+            ),
+        ),
+    ]
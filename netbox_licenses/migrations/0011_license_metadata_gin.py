@@ -0,0 +1,19 @@
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_licenses', '0010_license_monthly_price'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='license',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['metadata'],
+                name='netbox_lice_license_meta_gin',
+            ),
+        ),
+    ]
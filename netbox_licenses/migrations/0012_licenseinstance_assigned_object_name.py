@@ -0,0 +1,34 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_licenses', '0011_license_metadata_gin'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='licenseinstance',
+            name='assigned_object_name',
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text='Display name of the assigned object (blank once it is deleted)',
+                max_length=200,
+            ),
+        ),
+        migrations.AddField(
+            model_name='licenseinstance',
+            name='assigned_object_type_name',
+            field=models.CharField(blank=True, editable=False, max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='licenseinstance',
+            index=models.Index(fields=['assigned_object_type', 'assigned_object_id'], name='netbox_lice_assigne_7169a4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='licenseinstance',
+            index=models.Index(fields=['assigned_object_name'], name='netbox_lice_assigne_90a0cf_idx'),
+        ),
+    ]
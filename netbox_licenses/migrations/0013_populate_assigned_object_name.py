@@ -0,0 +1,71 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db import migrations
+from django.db.models import CharField, Exists, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce, Concat
+
+# Type labels as of this migration; kept here so later changes to the model helpers do not alter it
+TYPE_LABELS = {
+    'user': 'User',
+    'device': 'Device',
+    'contact': 'Contact',
+    'virtualmachine': 'VM',
+    'tenant': 'Tenant',
+    'service': 'Service',
+}
+
+
+def populate_assignment_display(apps, schema_editor):
+    """Fill in the assignment fields added in 0012 for existing license instances
+
+    One UPDATE per assigned content type copies the target's name column.
+    Objects without a name get a "<type> <id>" placeholder until the
+    license_backfill_assignments command resolves them through the live models.
+    """
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    LicenseInstance = apps.get_model('netbox_licenses', 'LicenseInstance')
+
+    type_ids = LicenseInstance.objects.order_by().values_list('assigned_object_type', flat=True).distinct()
+    for content_type in ContentType.objects.filter(pk__in=list(type_ids)):
+        try:
+            model = apps.get_model(content_type.app_label, content_type.model)
+        except LookupError:
+            continue
+
+        label = TYPE_LABELS.get(content_type.model, content_type.model.title())
+        name_field = 'username' if content_type.model == 'user' else 'name'
+        try:
+            model._meta.get_field(name_field)
+        except FieldDoesNotExist:
+            name_field = None
+
+        instances = LicenseInstance.objects.filter(assigned_object_type=content_type)
+        if name_field is None:
+            instances.update(assigned_object_type_name=label, assigned_object_name='')
+        else:
+            name = model._default_manager.filter(pk=OuterRef('assigned_object_id')).values(name_field)[:1]
+            instances.update(
+                assigned_object_type_name=label,
+                assigned_object_name=Coalesce(Subquery(name), Value('')),
+            )
+
+        instances.filter(
+            Exists(model._default_manager.filter(pk=OuterRef('assigned_object_id'))),
+            assigned_object_name='',
+        ).update(
+            assigned_object_name=Concat(Value(f'{label} '), Cast('assigned_object_id', CharField()))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        # The assignable models, which populate_assignment_display() reads
+        ('ipam', '__first__'),
+        ('virtualization', '__first__'),
+        ('netbox_licenses', '0012_licenseinstance_assigned_object_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_assignment_display, migrations.RunPython.noop),
+    ]
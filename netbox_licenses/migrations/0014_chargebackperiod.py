@@ -0,0 +1,46 @@
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def record_closed_months(apps, schema_editor):
+    """Create a ChargebackPeriod for every month already in the ledger"""
+    ChargebackEntry = apps.get_model('netbox_licenses', 'ChargebackEntry')
+    ChargebackPeriod = apps.get_model('netbox_licenses', 'ChargebackPeriod')
+
+    months = ChargebackEntry.objects.order_by('month').values('month').annotate(
+        entry_count=Count('pk'), total_cost=Sum('allocated_cost')
+    )
+    ChargebackPeriod.objects.bulk_create([
+        ChargebackPeriod(
+            month=row['month'],
+            entry_count=row['entry_count'],
+            total_cost=row['total_cost'] or Decimal('0'),
+        )
+        for row in months
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_licenses', '0013_populate_assigned_object_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChargebackPeriod',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                ('month', models.DateField(unique=True)),
+                ('entry_count', models.PositiveIntegerField(default=0)),
+                ('total_cost', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=16)),
+                ('closed', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-month'],
+            },
+        ),
+        migrations.RunPython(record_closed_months, migrations.RunPython.noop),
+    ]
@@ -1,17 +1,164 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
 from django.urls import reverse
-from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import ArrayField, DateRangeField, RangeOperators
+from django.contrib.postgres.indexes import GinIndex, GistIndex
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import FieldDoesNotExist
 from django.utils.functional import cached_property
 from django.utils import timezone
 from datetime import timedelta
+from decimal import Decimal
 from django.db import models
+from django.db.models import Case, F, Func, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, NullIf
 from netbox.models import NetBoxModel
+from utilities.querysets import RestrictedQuerySet
 from tenancy.models import Contact, Tenant
 from dcim.models import Manufacturer
 from .choices import LicenseStatusChoices, CurrencyChoices
 
 
+_bulk_instance_changes = ContextVar('bulk_instance_changes', default=False)
+
+
+@contextmanager
+def bulk_instance_changes():
+    """
+    Defer per-instance capacity checks and consumed_licenses recounts.
+
+    Used by set-based writes, which must validate capacity and refresh
+    consumed_licenses once per affected license themselves.
+    """
+    token = _bulk_instance_changes.set(True)
+    try:
+        yield
+    finally:
+        _bulk_instance_changes.reset(token)
+
+
+def in_bulk_instance_changes():
+    return _bulk_instance_changes.get()
+
+
+class DateRange(Func):
+    """PostgreSQL DATERANGE() constructor; pass Value('[]') as the third argument for inclusive bounds"""
+    function = 'DATERANGE'
+    output_field = DateRangeField()
+
+
+def allocation_period_expression(prefix=''):
+    """
+    Inclusive date range covered by a CostAllocation.
+
+    A NULL effective_to yields an unbounded upper end. This exact expression
+    backs the GiST index and exclusion constraint on CostAllocation, so
+    queries must build it through here for the planner to match the index.
+    """
+    return DateRange(F(f'{prefix}effective_from'), F(f'{prefix}effective_to'), Value('[]'))
+
+
+def nok_rate_expression(currency_field='currency'):
+    """
+    Query expression for today's NOK exchange rate of ``currency_field``.
+
+    NOK is always 1. Other currencies resolve to the latest ExchangeRate in
+    effect, looked up per row through the (currency, effective_date) unique
+    index; the result is NULL when no rate has been recorded.
+    """
+    latest_rate = ExchangeRate.objects.filter(
+        currency=OuterRef(currency_field),
+        effective_date__lte=timezone.now().date()
+    ).order_by('-effective_date').values('rate_to_nok')[:1]
+    return Case(
+        When(**{currency_field: CurrencyChoices.NOK}, then=Value(Decimal('1'))),
+        default=Subquery(latest_rate),
+        output_field=models.DecimalField(max_digits=12, decimal_places=6),
+    )
+
+
+def instance_nok_price_expression(instance_prefix='', license_prefix='license__'):
+    """
+    Query expression equivalent of LicenseInstance.instance_price_nok.
+
+    The prefixes are the lookup paths from the queried model to the instance
+    and to its license, e.g. ``('instances__', '')`` when annotating licenses.
+    """
+    return Coalesce(
+        NullIf(F(f'{instance_prefix}nok_price_override'), Value(Decimal('0'))),
+        F(f'{license_prefix}price') * nok_rate_expression(f'{license_prefix}currency'),
+        Value(Decimal('0')),
+        output_field=models.DecimalField(max_digits=12, decimal_places=2),
+    )
+
+
+def instance_monthly_cost_expression(instance_prefix='', license_prefix='license__'):
+    """
+    Query expression for an instance's NOK price normalised to one month.
+
+    Prefixes are as for instance_nok_price_expression().
+    """
+    price = instance_nok_price_expression(instance_prefix, license_prefix)
+    cycle = f'{license_prefix}billing_cycle'
+    return Case(
+        When(**{cycle: 'quarterly'}, then=price / Value(Decimal('3'))),
+        When(**{cycle: 'yearly'}, then=price / Value(Decimal('12'))),
+        When(**{cycle: 'one_time'}, then=Value(Decimal('0'))),
+        default=price,
+        output_field=models.DecimalField(max_digits=14, decimal_places=4),
+    )
+
+
+def instance_status_expression(prefix='', today=None):
+    """
+    Query expression equivalent of LicenseInstance.derived_status.
+
+    ``prefix`` is the lookup path from the queried model to the instance.
+    """
+    today = today or timezone.now().date()
+    return Case(
+        When(**{f'{prefix}start_date__gt': today}, then=Value(LicenseStatusChoices.PENDING)),
+        When(**{f'{prefix}end_date__lt': today}, then=Value(LicenseStatusChoices.EXPIRED)),
+        When(**{f'{prefix}end_date__lte': today + timedelta(days=30)}, then=Value(LicenseStatusChoices.WARNING)),
+        default=Value(LicenseStatusChoices.ACTIVE),
+        output_field=models.CharField(),
+    )
+
+
+def monthly_price_expression(prefix=''):
+    """
+    Query expression equivalent of License.monthly_equivalent_price.
+
+    ``prefix`` is the lookup path from the queried model to the license. With
+    no prefix this is also the expression of the License.monthly_price column.
+    """
+    price = F(f'{prefix}price')
+    return Case(
+        When(**{f'{prefix}billing_cycle': 'quarterly'}, then=price / Value(Decimal('3'))),
+        When(**{f'{prefix}billing_cycle': 'yearly'}, then=price / Value(Decimal('12'))),
+        When(**{f'{prefix}billing_cycle': 'one_time'}, then=Value(Decimal('0'))),
+        default=price,
+        output_field=models.DecimalField(max_digits=14, decimal_places=4),
+    )
+
+
+class LicenseQuerySet(RestrictedQuerySet):
+
+    def with_monthly_costs(self):
+        """
+        Annotate the NOK monthly price and the monthly cost of all slots and of
+        consumed slots, so MRC figures can be summed, filtered and sorted in SQL.
+        """
+        return self.annotate(
+            monthly_price_nok=F('monthly_price') * Coalesce(nok_rate_expression(), Value(Decimal('0'))),
+        ).annotate(
+            monthly_commitment=F('monthly_price_nok') * F('total_licenses'),
+            monthly_consumed_cost=F('monthly_price_nok') * F('consumed_licenses'),
+        )
+
+
 class License(NetBoxModel):
     name = models.CharField(
         max_length=50
@@ -81,12 +228,39 @@ class License(NetBoxModel):
         default='monthly',
         help_text="How frequently this license is billed"
     )
+    monthly_price = models.GeneratedField(
+        expression=monthly_price_expression(),
+        output_field=models.DecimalField(max_digits=14, decimal_places=4),
+        db_persist=True,
+        help_text="Price per slot normalised to one month, in the license currency"
+    )
 
     auto_renew = models.BooleanField(
         default=False,
         help_text="Automatically renew instances when they expire"
     )
 
+    # CAPACITY FORECAST FIELDS (maintained by AnalyticsService.forecast_capacity_exhaustion)
+    forecast_exhaustion_date = models.DateField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Projected date when all license slots will be consumed"
+    )
+    forecast_confidence = models.DecimalField(
+        max_digits=4,
+        decimal_places=3,
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Confidence of the exhaustion forecast (0-1)"
+    )
+    forecast_updated = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False
+    )
+
     # LEGACY FIELD - keeping for backward compatibility
     total_instances = models.PositiveIntegerField(default=0)
     comments = models.TextField(blank=True)
@@ -95,6 +269,13 @@ class License(NetBoxModel):
         return f"{self.name} ({self.vendor.name})"
 
     # NEW COMPUTED PROPERTIES
+    @property
+    def metadata_keys(self):
+        """Space-separated top-level metadata keys, as indexed for global search"""
+        if not isinstance(self.metadata, dict):
+            return ''
+        return ' '.join(sorted(str(key) for key in self.metadata))
+
     @property
     def available_licenses(self):
         """Calculate remaining available licenses"""
@@ -179,6 +360,8 @@ class License(NetBoxModel):
     def get_absolute_url(self):
         return reverse('plugins:netbox_licenses:license', args=[self.pk])
 
+    objects = LicenseQuerySet.as_manager()
+
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=["name", "vendor", "tenant"], name="unique_license_key")
@@ -187,6 +370,9 @@ class License(NetBoxModel):
             models.Index(fields=['external_id']),
             models.Index(fields=['vendor', 'external_id']),
             models.Index(fields=['consumed_licenses', 'total_licenses']),
+            models.Index(fields=['forecast_exhaustion_date']),
+            # Serves the metadata containment (@>) and key (?, ?&) filters
+            GinIndex(fields=['metadata'], name='netbox_lice_license_meta_gin'),
         ]
     
     def clean(self):
@@ -212,6 +398,149 @@ class License(NetBoxModel):
                 f"Please remove {actual_consumed - self.total_licenses} license instances first."
             )
 
+class ExchangeRate(NetBoxModel):
+    """Dated conversion rate from a currency to NOK"""
+
+    currency = models.CharField(
+        max_length=3,
+        choices=CurrencyChoices.CHOICES
+    )
+    rate_to_nok = models.DecimalField(
+        max_digits=12,
+        decimal_places=6,
+        help_text="Value of one unit of the currency in NOK"
+    )
+    effective_date = models.DateField(
+        help_text="Date from which this rate applies"
+    )
+    comments = models.TextField(blank=True)
+
+    # Process-local copy of today's rate table, see current_rates()
+    _rate_cache = {}
+
+    class Meta:
+        ordering = ['currency', '-effective_date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['currency', 'effective_date'],
+                name='unique_exchange_rate_per_day'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.currency} {self.rate_to_nok} NOK ({self.effective_date})"
+
+    def get_absolute_url(self):
+        return reverse('plugins:netbox_licenses:exchangerate', args=[self.pk])
+
+    def clean(self):
+        from django.core.exceptions import ValidationError
+
+        super().clean()
+        if self.currency == CurrencyChoices.NOK:
+            raise ValidationError({'currency': 'NOK is the base currency and always has a rate of 1'})
+        if self.rate_to_nok is not None and self.rate_to_nok <= 0:
+            raise ValidationError({'rate_to_nok': 'Rate must be greater than zero'})
+
+    @classmethod
+    def current_rates(cls):
+        """
+        Map of currency to the NOK rate in effect today.
+
+        The table is read once per process and day and held until the plugin
+        cache timeout passes or an ExchangeRate is saved or deleted.
+        """
+        from . import LicenseManagementConfig
+
+        now = timezone.now()
+        cached = cls._rate_cache
+        timeout = LicenseManagementConfig.caching_config['timeout']
+        if cached and cached['date'] == now.date() and (now - cached['loaded']).total_seconds() < timeout:
+            return cached['rates']
+
+        rates = dict(
+            cls.objects.filter(effective_date__lte=now.date())
+            .order_by('currency', '-effective_date')
+            .distinct('currency')
+            .values_list('currency', 'rate_to_nok')
+        )
+        rates[CurrencyChoices.NOK] = Decimal('1')
+        cls._rate_cache = {'date': now.date(), 'loaded': now, 'rates': rates}
+        return rates
+
+    @classmethod
+    def get_rate(cls, currency):
+        """Today's NOK rate for ``currency``, or None if no rate is recorded"""
+        return cls.current_rates().get(currency)
+
+    @classmethod
+    def clear_cache(cls):
+        cls._rate_cache = {}
+
+
+# Labels used when displaying what a license instance is assigned to
+ASSIGNED_OBJECT_TYPE_LABELS = {
+    'user': 'User',
+    'device': 'Device',
+    'contact': 'Contact',
+    'virtualmachine': 'VM',
+    'tenant': 'Tenant',
+    'service': 'Service',
+}
+
+
+def assigned_object_type_label(content_type):
+    if content_type is None:
+        return ''
+    return ASSIGNED_OBJECT_TYPE_LABELS.get(content_type.model, content_type.model.title())
+
+
+def assigned_object_name_field(content_type, model=None):
+    """Column holding an assignable model's display name (None if it has none)
+
+    ``model`` is the content type's model class; migrations pass the
+    historical model, since historical content types cannot resolve it.
+    """
+    if model is None:
+        model = content_type.model_class() if content_type else None
+    if model is None:
+        return None
+    name_field = 'username' if content_type.model == 'user' else 'name'
+    try:
+        model._meta.get_field(name_field)
+    except FieldDoesNotExist:
+        return None
+    return name_field
+
+
+def update_assignment_display(instances, content_type, model):
+    """
+    Copy assigned object names onto ``instances`` of one content type in one UPDATE.
+
+    ``model`` is the content type's model class. Instances whose object has no
+    name (or a model without a name column) are left blank. Returns the number
+    of rows updated.
+    """
+    label = assigned_object_type_label(content_type)
+    name_field = assigned_object_name_field(content_type, model)
+    if name_field is None:
+        return instances.update(assigned_object_type_name=label, assigned_object_name='')
+
+    name = model._default_manager.filter(pk=OuterRef('assigned_object_id')).values(name_field)[:1]
+    return instances.update(
+        assigned_object_type_name=label,
+        assigned_object_name=Coalesce(Subquery(name), Value('')),
+    )
+
+
+def assigned_object_display_name(obj):
+    """Display name stored in LicenseInstance.assigned_object_name"""
+    if obj is None:
+        return ''
+    name = getattr(obj, 'username' if obj._meta.model_name == 'user' else 'name', None)
+    return str(name or obj)[:200]
+
+
 class LicenseInstance(NetBoxModel):
     license = models.ForeignKey(
         to=License,
@@ -256,6 +585,26 @@ class LicenseInstance(NetBoxModel):
 
     comments = models.TextField(blank=True)
 
+    # Copied from the assigned object so lists can show, sort and search assignments
+    # without resolving the generic foreign key. Kept in sync by signals.
+    assigned_object_name = models.CharField(
+        max_length=200,
+        blank=True,
+        editable=False,
+        help_text="Display name of the assigned object (blank once it is deleted)"
+    )
+    assigned_object_type_name = models.CharField(
+        max_length=50,
+        blank=True,
+        editable=False
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['assigned_object_type', 'assigned_object_id']),
+            models.Index(fields=['assigned_object_name']),
+        ]
+
     def __str__(self):
         return f"{self.license.name} (#{self.id})"
 
@@ -283,9 +632,11 @@ class LicenseInstance(NetBoxModel):
         if self.license_currency == CurrencyChoices.NOK:
             return self.license_price
 
-        # For other currencies, we'd need a conversion rate
-        # Since we're simplifying, instances must specify NOK price if license isn't in NOK
-        return Decimal('0.0')
+        # Otherwise convert with the current exchange rate, if one is recorded
+        rate = ExchangeRate.get_rate(self.license_currency)
+        if rate is None:
+            return Decimal('0.0')
+        return (self.license_price * rate).quantize(Decimal('0.01'))
 
     @property
     def display_price(self):
@@ -294,6 +645,8 @@ class LicenseInstance(NetBoxModel):
             return f"{self.nok_price_override} NOK (instance override)"
         elif self.license_currency == CurrencyChoices.NOK:
             return f"{self.license_price} NOK"
+        elif ExchangeRate.get_rate(self.license_currency) is not None:
+            return f"{self.license_price} {self.license_currency} (≈ {self.instance_price_nok} NOK)"
         else:
             currency_display = dict(CurrencyChoices.CHOICES).get(self.license_currency, self.license_currency)
             return f"{self.license_price} {currency_display} (NOK price required)"
@@ -331,23 +684,29 @@ class LicenseInstance(NetBoxModel):
     # NEW HELPER METHODS FOR ASSIGNMENT DISPLAY
     def get_assignment_display(self):
         """Return human-readable assignment info"""
-        if not self.assigned_object:
+        if not self.assigned_object_name:
             return "Unassigned"
-        
-        if self.assigned_object_type.model == 'user':
-            return f"User: {self.assigned_object.username}"
-        elif self.assigned_object_type.model == 'device':
-            return f"Device: {self.assigned_object.name}"
-        elif self.assigned_object_type.model == 'contact':
-            return f"Contact: {self.assigned_object.name}"
-        elif self.assigned_object_type.model == 'virtualmachine':
-            return f"VM: {self.assigned_object.name}"
-        elif self.assigned_object_type.model == 'tenant':
-            return f"Tenant: {self.assigned_object.name}"
-        elif self.assigned_object_type.model == 'service':
-            return f"Service: {self.assigned_object.name}"
-        else:
-            return f"{self.assigned_object_type.model.title()}: {str(self.assigned_object)}"
+        return f"{self.assigned_object_type_name}: {self.assigned_object_name}"
+
+    def get_assigned_object_url(self):
+        """Detail URL of the assigned object, built without loading it"""
+        from django.urls import NoReverseMatch
+        from utilities.views import get_viewname
+
+        if not self.assigned_object_type_id or not self.assigned_object_name:
+            return None
+        model = ContentType.objects.get_for_id(self.assigned_object_type_id).model_class()
+        if model is None:
+            return None
+        try:
+            return reverse(get_viewname(model), kwargs={'pk': self.assigned_object_id})
+        except NoReverseMatch:
+            return None
+
+    def refresh_assignment_display(self):
+        """Copy the assigned object's name and type label onto this instance"""
+        self.assigned_object_type_name = assigned_object_type_label(self.assigned_object_type)
+        self.assigned_object_name = assigned_object_display_name(self.assigned_object)
     
     @property
     def assignment_type(self):
@@ -402,7 +761,7 @@ class LicenseInstance(NetBoxModel):
         from django.core.exceptions import ValidationError
         super().clean()
         
-        if self.license:
+        if self.license and not in_bulk_instance_changes():
             # Check if creating a new instance would exceed total licenses
             current_count = self.license.instances.count()
             
@@ -418,6 +777,17 @@ class LicenseInstance(NetBoxModel):
                 )
 
     def save(self, *args, **kwargs):
+        self.apply_defaults()
+        self.refresh_assignment_display()
+
+        # Validate allocation limits before saving
+        self.full_clean()
+
+        # Don't auto-set price_override anymore - let it remain None to use license price
+        super().save(*args, **kwargs)
+
+    def apply_defaults(self):
+        """Fill in derived fields; called by save() and by bulk writes that bypass it"""
         # Auto-set assignment type if not provided (assignments are now required)
         if not self.assigned_object_type_id and self.license:
             self.assigned_object_type = self.license.assignment_type
@@ -426,12 +796,6 @@ class LicenseInstance(NetBoxModel):
         if self.start_date and not self.end_date and self.license:
             self._calculate_end_date()
 
-        # Validate allocation limits before saving
-        self.full_clean()
-
-        # Don't auto-set price_override anymore - let it remain None to use license price
-        super().save(*args, **kwargs)
-
     def _calculate_end_date(self):
         """Calculate end date based on license billing cycle"""
         from datetime import timedelta
@@ -643,6 +1007,59 @@ class LicenseAnalytics(models.Model):
         return f"{self.license.name} - {self.metric_type}: {self.metric_value}"
 
 
+class LicenseAnalyticsRollup(models.Model):
+    """Downsampled LicenseAnalytics values for one aggregation period"""
+
+    license = models.ForeignKey(
+        to=License,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    metric_type = models.CharField(max_length=20, choices=LicenseAnalytics.METRIC_TYPES)
+    bucket = models.DateTimeField(help_text="Start of the aggregation period")
+
+    min_value = models.DecimalField(max_digits=12, decimal_places=2)
+    max_value = models.DecimalField(max_digits=12, decimal_places=2)
+    avg_value = models.DecimalField(max_digits=14, decimal_places=4)
+    last_value = models.DecimalField(max_digits=12, decimal_places=2)
+    sample_count = models.PositiveIntegerField()
+
+    # Period length and the matching Trunc() kind, set on each tier
+    resolution = None
+    truncate = None
+
+    class Meta:
+        abstract = True
+        ordering = ['-bucket']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['license', 'metric_type', 'bucket'],
+                name='%(app_label)s_%(class)s_unique_bucket'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.license.name} - {self.metric_type} @ {self.bucket}: {self.avg_value}"
+
+
+class LicenseAnalyticsHourly(LicenseAnalyticsRollup):
+    """Hourly rollup of LicenseAnalytics"""
+    resolution = timedelta(hours=1)
+    truncate = 'hour'
+
+
+class LicenseAnalyticsDaily(LicenseAnalyticsRollup):
+    """Daily rollup of LicenseAnalyticsHourly"""
+    resolution = timedelta(days=1)
+    truncate = 'day'
+
+
+class LicenseAnalyticsMonthly(LicenseAnalyticsRollup):
+    """Monthly rollup of LicenseAnalyticsDaily"""
+    resolution = timedelta(days=30)
+    truncate = 'month'
+
+
 class LicenseAlert(NetBoxModel):
     """License alerts and notifications"""
     
@@ -718,6 +1135,25 @@ class LicenseAlert(NetBoxModel):
         return (timezone.now() - self.triggered_at).total_seconds() / 3600
 
 
+class CostAllocationQuerySet(RestrictedQuerySet):
+    """Point-in-time and range lookups served by the allocation period GiST index"""
+
+    def with_period(self):
+        if 'period' in self.query.annotations:
+            return self
+        return self.alias(period=allocation_period_expression())
+
+    def active_on(self, day):
+        """Allocations in effect on ``day``"""
+        return self.with_period().filter(period__contains=day)
+
+    def overlapping(self, start, end):
+        """Allocations in effect at any point between ``start`` and ``end`` inclusive"""
+        return self.with_period().filter(
+            period__overlap=DateRange(Value(start), Value(end), Value('[]'))
+        )
+
+
 class CostAllocation(NetBoxModel):
     """License cost allocation to departments/projects"""
     
@@ -755,9 +1191,26 @@ class CostAllocation(NetBoxModel):
         help_text="Rules and criteria for this allocation"
     )
     
+    objects = CostAllocationQuerySet.as_manager()
+
     class Meta:
         ordering = ['-effective_from']
         unique_together = ['license', 'allocation_target', 'effective_from']
+        indexes = [
+            GistIndex(allocation_period_expression(), name='netbox_lice_costall_period_idx'),
+        ]
+        constraints = [
+            # A license can only be allocated to the same target once at any point in time
+            ExclusionConstraint(
+                name='netbox_licenses_costallocation_no_overlap',
+                index_type='GIST',
+                expressions=[
+                    ('license', RangeOperators.EQUAL),
+                    ('allocation_target', RangeOperators.EQUAL),
+                    (allocation_period_expression(), RangeOperators.OVERLAPS),
+                ],
+            ),
+        ]
     
     def __str__(self):
         return f"{self.license.name} -> {self.allocation_target} ({self.percentage}%)"
@@ -768,3 +1221,109 @@ class CostAllocation(NetBoxModel):
         today = timezone.now().date()
         return (self.effective_from <= today and 
                 (self.effective_to is None or self.effective_to >= today))
+
+
+class ChargebackQuerySet(models.QuerySet):
+    """Refuses the bulk update() and delete() that would bypass the immutable models' save() and delete()"""
+
+    def update(self, **kwargs):
+        from django.core.exceptions import ValidationError
+
+        raise ValidationError("Chargeback records are immutable once the month is closed")
+
+    def delete(self):
+        from django.core.exceptions import ValidationError
+
+        raise ValidationError("Chargeback records are immutable once the month is closed")
+
+
+class ChargebackPeriod(models.Model):
+    """A closed chargeback month; its ChargebackEntry rows are the ledger for that month"""
+
+    month = models.DateField(unique=True, help_text="First day of the closed month")
+    entry_count = models.PositiveIntegerField(default=0)
+    total_cost = models.DecimalField(max_digits=16, decimal_places=2, default=Decimal('0'))
+    closed = models.DateTimeField(auto_now_add=True)
+
+    objects = ChargebackQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-month']
+
+    def __str__(self):
+        return f"{self.month:%Y-%m}"
+
+    def save(self, *args, **kwargs):
+        from django.core.exceptions import ValidationError
+
+        if not self._state.adding:
+            raise ValidationError("Chargeback periods are immutable once closed")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        from django.core.exceptions import ValidationError
+
+        raise ValidationError("Chargeback periods are immutable once closed")
+
+
+class ChargebackEntry(models.Model):
+    """Immutable month-close record of license cost charged to an allocation target"""
+
+    month = models.DateField(help_text="First day of the charged month")
+    allocation = models.ForeignKey(
+        to=CostAllocation,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='chargeback_entries'
+    )
+    license = models.ForeignKey(
+        to=License,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='chargeback_entries'
+    )
+
+    # Snapshot of the allocation at month close
+    license_name = models.CharField(max_length=50)
+    allocation_type = models.CharField(max_length=20, choices=CostAllocation.ALLOCATION_TYPES)
+    allocation_target = models.CharField(max_length=100)
+    percentage = models.DecimalField(max_digits=5, decimal_places=2)
+
+    license_cost = models.DecimalField(
+        max_digits=14, decimal_places=2,
+        help_text="Monthly NOK cost of the license's active instances"
+    )
+    allocated_cost = models.DecimalField(max_digits=14, decimal_places=2)
+    currency = models.CharField(
+        max_length=3,
+        choices=CurrencyChoices.CHOICES,
+        default=CurrencyChoices.NOK
+    )
+    created = models.DateTimeField(auto_now_add=True)
+
+    objects = ChargebackQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-month', 'allocation_target']
+        constraints = [
+            models.UniqueConstraint(fields=['month', 'allocation'], name='unique_chargeback_allocation_month')
+        ]
+        indexes = [
+            models.Index(fields=['month', 'allocation_target']),
+        ]
+        verbose_name_plural = 'chargeback entries'
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} {self.allocation_target}: {self.allocated_cost} {self.currency}"
+
+    def save(self, *args, **kwargs):
+        from django.core.exceptions import ValidationError
+
+        if not self._state.adding:
+            raise ValidationError("Chargeback entries are immutable once the month is closed")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        from django.core.exceptions import ValidationError
+
+        raise ValidationError("Chargeback entries are immutable once the month is closed")
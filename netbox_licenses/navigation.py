@@ -17,6 +17,14 @@ licenseinstance_buttons = (
     ),
 )
 
+exchangerate_buttons = (
+    PluginMenuButton(
+        link='plugins:netbox_licenses:exchangerate_add',
+        title='Add Exchange Rate',
+        icon_class='mdi mdi-plus-thick'
+    ),
+)
+
 # Create the menu with proper navigation structure
 menu = PluginMenu(
     label='License Management',
@@ -38,6 +46,11 @@ menu = PluginMenu(
                 link_text='License Instances',
                 buttons=licenseinstance_buttons
             ),
+            PluginMenuItem(
+                link='plugins:netbox_licenses:exchangerate_list',
+                link_text='Exchange Rates',
+                buttons=exchangerate_buttons
+            ),
         )),
     ),
     icon_class='mdi mdi-certificate'
@@ -0,0 +1,32 @@
+from netbox.search import FieldTypes, SearchIndex, register_search
+
+from . import models
+
+
+@register_search
+class LicenseIndex(SearchIndex):
+    model = models.License
+    fields = (
+        ('name', 100),
+        ('external_id', 110),
+        ('metadata_keys', 400),
+        ('comments', 5000),
+    )
+    display_attrs = ('vendor', 'tenant', 'external_id', 'total_licenses', 'consumed_licenses')
+
+    @staticmethod
+    def get_field_type(instance, field_name):
+        # metadata_keys is a property, not a model field
+        if field_name == 'metadata_keys':
+            return FieldTypes.STRING
+        return SearchIndex.get_field_type(instance, field_name)
+
+
+@register_search
+class LicenseInstanceIndex(SearchIndex):
+    model = models.LicenseInstance
+    fields = (
+        ('assigned_object_name', 300),
+        ('comments', 5000),
+    )
+    display_attrs = ('license', 'assigned_object_type', 'start_date', 'end_date')
@@ -1,21 +1,69 @@
 # Phase 3: Business Logic Services
 
 from django.utils import timezone
-from django.db.models import Q, F
+from django.db import IntegrityError, transaction
+from django.db.models import Q, F, OuterRef, Subquery, Aggregate, Avg, Count, DateField, DecimalField, FloatField, Max, Min, Sum, Value
+from django.db.models.functions import Cast, Coalesce, Extract, Greatest, Trunc
 from datetime import timedelta, date
 from typing import List, Dict, Optional
 from decimal import Decimal
 import logging
 
+import numpy as np
+
+from .caching import bump_data_version, get_report
+from .instrumentation import instrumented
+
 from .models import (
     License, LicenseInstance, LicenseRenewal, 
     LicenseAlert, LicenseAnalytics, VendorIntegration,
-    CostAllocation
+    CostAllocation, ChargebackEntry, ChargebackPeriod, ExchangeRate,
+    instance_nok_price_expression, instance_monthly_cost_expression,
+    instance_status_expression,
+    LicenseAnalyticsHourly, LicenseAnalyticsDaily, LicenseAnalyticsMonthly,
+    assigned_object_display_name, assigned_object_name_field, assigned_object_type_label,
+    update_assignment_display,
 )
 
 logger = logging.getLogger(__name__)
 
+# Analytics rollup tiers, finest first. Each tier is built from the previous one.
+ANALYTICS_ROLLUP_TIERS = (LicenseAnalyticsHourly, LicenseAnalyticsDaily, LicenseAnalyticsMonthly)
+
+# Expiry timeline bucket sizes, as date_trunc() kinds
+EXPIRY_TIMELINE_INTERVALS = ('week', 'month')
+
+# Default number of points a trend window should be split into when no resolution is given
+TREND_TARGET_POINTS = 12
+
+# Named trend resolutions accepted by the API; 'raw' bypasses the rollups
+TREND_RESOLUTIONS = {
+    'raw': timedelta(0),
+    **{tier.truncate: tier.resolution for tier in ANALYTICS_ROLLUP_TIERS},
+}
+
+
+class LastValue(Aggregate):
+    """Value of ``expression`` from the row with the greatest ``ordering`` (PostgreSQL)"""
+    function = 'ARRAY_AGG'
+
+    def __init__(self, expression, ordering, **extra):
+        super().__init__(expression, ordering, **extra)
 
+    def _resolve_output_field(self):
+        return self.source_expressions[0].output_field
+
+    def as_sql(self, compiler, connection, **extra_context):
+        value, ordering = self.source_expressions
+        value_sql, value_params = compiler.compile(value)
+        ordering_sql, ordering_params = compiler.compile(ordering)
+        return (
+            f'({self.function}({value_sql} ORDER BY {ordering_sql} DESC))[1]',
+            (*value_params, *ordering_params)
+        )
+
+
+@instrumented
 class LicenseLifecycleService:
     """Service for automated license lifecycle management"""
     
@@ -28,7 +76,56 @@ class LicenseLifecycleService:
             end_date__lte=cutoff_date,
             end_date__gte=timezone.now().date()
         ).select_related('license', 'license__vendor')
-    
+
+    @staticmethod
+    def get_expiry_timeline(instances=None, interval: str = 'month', months: int = 12) -> List[Dict]:
+        """Expiring seats and their NOK renewal value per week or month
+
+        Covers the current period through ``months`` months ahead. Seats are
+        grouped with date_trunc() in a single query; periods with nothing
+        expiring are included with zero totals. Weeks start on Monday.
+        """
+        from dateutil.relativedelta import relativedelta
+
+        if interval not in EXPIRY_TIMELINE_INTERVALS:
+            raise ValueError(f'Unknown interval: {interval}')
+        if instances is None:
+            instances = LicenseInstance.objects.all()
+
+        today = timezone.now().date()
+        cutoff = today + relativedelta(months=months)
+        auto_renew = Q(auto_renew=True) | Q(auto_renew__isnull=True, license__auto_renew=True)
+
+        rows = instances.prefetch_related(None).filter(
+            end_date__gte=today, end_date__lt=cutoff
+        ).annotate(
+            period=Trunc('end_date', interval, output_field=DateField())
+        ).order_by('period').values('period').annotate(
+            seats=Count('pk'),
+            auto_renew_seats=Count('pk', filter=auto_renew),
+            renewal_value_nok=Sum(instance_nok_price_expression()),
+            auto_renew_value_nok=Sum(instance_nok_price_expression(), filter=auto_renew),
+        )
+        totals = {row['period']: row for row in rows}
+
+        if interval == 'week':
+            period, step = today - timedelta(days=today.weekday()), relativedelta(weeks=1)
+        else:
+            period, step = today.replace(day=1), relativedelta(months=1)
+
+        timeline = []
+        while period < cutoff:
+            row = totals.get(period, {})
+            timeline.append({
+                'period': period,
+                'seats': row.get('seats', 0),
+                'auto_renew_seats': row.get('auto_renew_seats', 0),
+                'renewal_value_nok': row.get('renewal_value_nok') or Decimal('0'),
+                'auto_renew_value_nok': row.get('auto_renew_value_nok') or Decimal('0'),
+            })
+            period += step
+        return timeline
+
     @staticmethod
     def create_renewal_alerts(days_ahead: int = 60):
         """Create renewal alerts for licenses approaching renewal"""
@@ -125,6 +222,7 @@ class LicenseLifecycleService:
         return processed
 
 
+@instrumented
 class ComplianceMonitoringService:
     """Service for automated compliance monitoring and alerting"""
     
@@ -219,141 +317,661 @@ class ComplianceMonitoringService:
         return results
 
 
+@instrumented
 class AnalyticsService:
     """Service for license analytics and trend analysis"""
     
     @staticmethod
-    def record_license_metrics():
-        """Record current license metrics for trend analysis"""
-        licenses = License.objects.all()
+    def record_license_metrics(batch_size: int = 5000) -> int:
+        """Record current license metrics for trend analysis
+
+        Every metric for every license is derived from a single aggregated query
+        and written with chunked bulk inserts inside one transaction.
+        """
+        snapshot = License.objects.order_by().annotate(
+            instance_count=Count('instances'),
+            instance_cost=Coalesce(
+                Sum(instance_nok_price_expression('instances__', '')),
+                Value(Decimal('0')),
+            ),
+        ).values_list('pk', 'total_licenses', 'consumed_licenses', 'instance_count', 'instance_cost')
+
         metrics_recorded = 0
-        
-        for license in licenses:
-            metrics = [
-                ('utilization', license.utilization_percentage),
-                ('cost', license.total_cost or 0),
-                ('instances', license.instances.count()),
-                ('available', license.available_licenses),
-                ('consumed', license.consumed_licenses),
-            ]
-            
-            # Calculate cost efficiency (licenses per dollar)
-            if license.total_cost and license.total_cost > 0:
-                efficiency = license.consumed_licenses / float(license.total_cost)
-                metrics.append(('efficiency', efficiency))
-            
-            for metric_type, value in metrics:
-                LicenseAnalytics.objects.create(
-                    license=license,
-                    metric_type=metric_type,
-                    metric_value=Decimal(str(value))
+        batch = []
+
+        with transaction.atomic():
+            for license_id, total, consumed, instance_count, cost in snapshot.iterator(chunk_size=batch_size):
+                metrics = [
+                    ('utilization', (consumed / total) * 100 if total else 0),
+                    ('cost', cost),
+                    ('instances', instance_count),
+                    ('available', total - consumed),
+                    ('consumed', consumed),
+                ]
+
+                # Calculate cost efficiency (licenses per dollar)
+                if cost > 0:
+                    metrics.append(('efficiency', consumed / float(cost)))
+
+                batch.extend(
+                    LicenseAnalytics(
+                        license_id=license_id,
+                        metric_type=metric_type,
+                        metric_value=Decimal(str(value))
+                    )
+                    for metric_type, value in metrics
                 )
-                metrics_recorded += 1
-        
+
+                if len(batch) >= batch_size:
+                    LicenseAnalytics.objects.bulk_create(batch, batch_size=batch_size)
+                    metrics_recorded += len(batch)
+                    batch = []
+
+            if batch:
+                LicenseAnalytics.objects.bulk_create(batch, batch_size=batch_size)
+                metrics_recorded += len(batch)
+
+            bump_data_version(LicenseAnalytics)
+
         logger.info(f"Recorded {metrics_recorded} analytics metrics")
         return metrics_recorded
-    
+
+    @staticmethod
+    def rollup_metrics(batch_size: int = 5000) -> Dict[str, int]:
+        """Refresh the hourly, daily and monthly analytics rollups
+
+        Each tier is recomputed from its most recent bucket onwards, so the job
+        can run as often as metrics are recorded.
+        """
+        results = {}
+        source = None
+
+        for tier in ANALYTICS_ROLLUP_TIERS:
+            results[tier.truncate] = AnalyticsService._rollup_tier(tier, source, batch_size)
+            source = tier
+
+        logger.info(f"Analytics rollup completed: {results}")
+        return results
+
+    @staticmethod
+    def _rollup_tier(tier, source, batch_size: int) -> int:
+        """Aggregate ``source`` (raw LicenseAnalytics when None) into ``tier``"""
+        since = tier.objects.aggregate(latest=Max('bucket'))['latest']
+
+        if source is None:
+            queryset = LicenseAnalytics.objects.all()
+            time_field = 'timestamp'
+            aggregates = {
+                'min_value': Min('metric_value'),
+                'max_value': Max('metric_value'),
+                'avg_value': Avg('metric_value'),
+                'last_value': LastValue('metric_value', 'timestamp'),
+                'sample_count': Count('id'),
+            }
+        else:
+            queryset = source.objects.all()
+            time_field = 'bucket'
+            aggregates = {
+                'min_value': Min('min_value'),
+                'max_value': Max('max_value'),
+                'avg_value': Sum(F('avg_value') * F('sample_count'), output_field=DecimalField()) / Sum('sample_count'),
+                'last_value': LastValue('last_value', 'bucket'),
+                'sample_count': Sum('sample_count'),
+            }
+
+        if since is not None:
+            queryset = queryset.filter(**{f'{time_field}__gte': since})
+
+        rows = queryset.order_by().annotate(
+            period=Trunc(time_field, tier.truncate)
+        ).values('license_id', 'metric_type', 'period').annotate(**aggregates)
+
+        update_fields = ['min_value', 'max_value', 'avg_value', 'last_value', 'sample_count']
+        written = 0
+        batch = []
+
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(tier(
+                license_id=row['license_id'],
+                metric_type=row['metric_type'],
+                bucket=row['period'],
+                **{field: row[field] for field in update_fields}
+            ))
+            if len(batch) >= batch_size:
+                tier.objects.bulk_create(
+                    batch, update_conflicts=True,
+                    unique_fields=['license', 'metric_type', 'bucket'], update_fields=update_fields
+                )
+                written += len(batch)
+                batch = []
+
+        if batch:
+            tier.objects.bulk_create(
+                batch, update_conflicts=True,
+                unique_fields=['license', 'metric_type', 'bucket'], update_fields=update_fields
+            )
+            written += len(batch)
+
+        bump_data_version(tier)
+        return written
+
+    @staticmethod
+    def get_trend_sources(days: int, resolution: Optional[timedelta] = None) -> list:
+        """Analytics sources to try for a trend window, coarsest acceptable first
+
+        The coarsest rollup tier whose period does not exceed ``resolution``
+        (by default the window split into TREND_TARGET_POINTS) comes first,
+        followed by the finer tiers and finally raw LicenseAnalytics (None).
+        """
+        if resolution is None:
+            resolution = timedelta(days=days) / TREND_TARGET_POINTS
+
+        tiers = [tier for tier in ANALYTICS_ROLLUP_TIERS if tier.resolution <= resolution]
+        return list(reversed(tiers)) + [None]
+
     @staticmethod
-    def get_trend_analysis(license: License, metric_type: str, days: int = 30) -> Dict:
+    def get_trend_analysis(license: License, metric_type: str, days: int = 30,
+                           resolution: Optional[timedelta] = None) -> Dict:
         """Get trend analysis for a specific license and metric"""
         cutoff_date = timezone.now() - timedelta(days=days)
-        
-        analytics = LicenseAnalytics.objects.filter(
-            license=license,
-            metric_type=metric_type,
-            timestamp__gte=cutoff_date
-        ).order_by('timestamp')
-        
-        if not analytics.exists():
+
+        # Read the coarsest populated tier that satisfies the requested resolution
+        for source in AnalyticsService.get_trend_sources(days, resolution):
+            if source is None:
+                values = [
+                    (value, value, 1) for value in LicenseAnalytics.objects.filter(
+                        license=license,
+                        metric_type=metric_type,
+                        timestamp__gte=cutoff_date
+                    ).order_by('timestamp').values_list('metric_value', flat=True)
+                ]
+            else:
+                values = list(source.objects.filter(
+                    license=license,
+                    metric_type=metric_type,
+                    bucket__gte=cutoff_date
+                ).order_by('bucket').values_list('last_value', 'avg_value', 'sample_count'))
+            if values:
+                break
+
+        if not values:
             return {'trend': 'no_data', 'change': 0, 'data_points': 0}
-        
-        values = list(analytics.values_list('metric_value', flat=True))
-        
+
         if len(values) < 2:
             return {'trend': 'insufficient_data', 'change': 0, 'data_points': len(values)}
-        
+
         # Calculate trend
-        first_value = float(values[0])
-        last_value = float(values[-1])
+        first_value = float(values[0][0])
+        last_value = float(values[-1][0])
         change = last_value - first_value
-        
+        samples = sum(count for _, _, count in values)
+
         if abs(change) < 0.01:  # Less than 1% change
             trend = 'stable'
         elif change > 0:
             trend = 'increasing'
         else:
             trend = 'decreasing'
-        
+
         return {
             'trend': trend,
             'change': change,
             'change_percentage': (change / first_value * 100) if first_value != 0 else 0,
             'data_points': len(values),
+            'resolution': source.truncate if source else 'raw',
             'first_value': first_value,
             'last_value': last_value,
-            'average': sum(float(v) for v in values) / len(values)
+            'average': sum(float(avg) * count for _, avg, count in values) / samples
         }
-    
+
     @staticmethod
-    def get_cost_optimization_recommendations() -> List[Dict]:
-        """Generate cost optimization recommendations"""
-        recommendations = []
-        
-        # Find underutilized licenses
-        underutilized = License.objects.filter(
+    def load_metric_series(metric_type: str, days: int, resolution: Optional[timedelta] = None,
+                           licenses=None):
+        """Load the metric history of many licenses as columnar NumPy arrays
+
+        Returns ``(source, license_ids, x, y)`` where ``x`` is days since the
+        earliest point and rows are sorted by license and time. ``source`` is the
+        rollup tier read (None for raw LicenseAnalytics).
+        """
+        cutoff_date = timezone.now() - timedelta(days=days)
+
+        for source in AnalyticsService.get_trend_sources(days, resolution):
+            if source is None:
+                queryset = LicenseAnalytics.objects.filter(timestamp__gte=cutoff_date)
+                time_field, value_field = 'timestamp', 'metric_value'
+            else:
+                queryset = source.objects.filter(bucket__gte=cutoff_date)
+                time_field, value_field = 'bucket', 'last_value'
+
+            queryset = queryset.filter(metric_type=metric_type)
+            if licenses is not None:
+                queryset = queryset.filter(license__in=licenses.values('pk'))
+
+            rows = list(queryset.order_by('license_id', time_field).values_list(
+                'license_id',
+                Extract(time_field, 'epoch'),
+                Cast(value_field, FloatField()),
+            ))
+            if rows:
+                break
+
+        if not rows:
+            empty = np.empty(0)
+            return None, empty.astype(np.int64), empty, empty
+
+        data = np.array(rows, dtype=float)
+        x = (data[:, 1] - data[:, 1].min()) / 86400
+        return source, data[:, 0].astype(np.int64), x, data[:, 2]
+
+    @staticmethod
+    def _grouped_linear_fit(ids, x, y) -> Dict:
+        """Per-group least-squares fit of ``y`` against ``x``
+
+        ``ids`` must be sorted so that each group is contiguous. Returns arrays
+        indexed by group: slope, mean, volatility (standard deviation) and r².
+        """
+        license_ids, starts, counts = np.unique(ids, return_index=True, return_counts=True)
+        n = counts.astype(float)
+
+        def group_sum(values):
+            return np.add.reduceat(values, starts)
+
+        sum_x, sum_y = group_sum(x), group_sum(y)
+        sum_xx, sum_xy, sum_yy = group_sum(x * x), group_sum(x * y), group_sum(y * y)
+
+        var_x = n * sum_xx - sum_x ** 2
+        var_y = n * sum_yy - sum_y ** 2
+        covariance = n * sum_xy - sum_x * sum_y
+
+        slope = np.divide(covariance, var_x, out=np.zeros_like(var_x), where=var_x > 0)
+        r_squared = np.divide(covariance ** 2, var_x * var_y, out=np.zeros_like(var_x), where=(var_x > 0) & (var_y > 0))
+        mean = sum_y / n
+
+        return {
+            'license_ids': license_ids,
+            'starts': starts,
+            'ends': starts + counts - 1,
+            'counts': counts,
+            'slope': slope,
+            'mean': mean,
+            'volatility': np.sqrt(np.maximum(sum_yy / n - mean ** 2, 0)),
+            'r_squared': np.clip(r_squared, 0, 1),
+        }
+
+    @staticmethod
+    def get_portfolio_trends(metric_type: str = 'utilization', days: int = 30,
+                             resolution: Optional[timedelta] = None, moving_average_window: int = 7,
+                             licenses=None) -> Dict:
+        """Vectorized trend statistics for every license at once
+
+        Computes least-squares slope (per day), moving average of the latest
+        points, volatility (standard deviation) and change over the window
+        for all licenses in a single pass over the metric history.
+        """
+        source, ids, x, y = AnalyticsService.load_metric_series(metric_type, days, resolution, licenses)
+        result = {
+            'metric_type': metric_type,
+            'days': days,
+            'resolution': source.truncate if source else 'raw',
+            'licenses': [],
+        }
+        if not len(ids):
+            return result
+
+        fit = AnalyticsService._grouped_linear_fit(ids, x, y)
+        license_ids, starts, ends, counts = fit['license_ids'], fit['starts'], fit['ends'], fit['counts']
+        slope, mean, volatility = fit['slope'], fit['mean'], fit['volatility']
+
+        cumulative = np.concatenate(([0.0], np.cumsum(y)))
+        window = np.minimum(counts, moving_average_window)
+        moving_average = (cumulative[ends + 1] - cumulative[ends + 1 - window]) / window
+
+        first, last = y[starts], y[ends]
+        change = last - first
+        change_percentage = np.divide(change * 100, first, out=np.zeros_like(change), where=first != 0)
+
+        trend = np.select(
+            [counts < 2, np.abs(change) < 0.01, change > 0],
+            ['insufficient_data', 'stable', 'increasing'],
+            default='decreasing'
+        )
+
+        columns = (
+            license_ids.tolist(), counts.tolist(), first.tolist(), last.tolist(), change.tolist(),
+            change_percentage.tolist(), slope.tolist(), moving_average.tolist(), volatility.tolist(),
+            mean.tolist(), trend.tolist(),
+        )
+        keys = (
+            'license_id', 'data_points', 'first_value', 'last_value', 'change',
+            'change_percentage', 'slope_per_day', 'moving_average', 'volatility',
+            'average', 'trend',
+        )
+        result['licenses'] = [dict(zip(keys, row)) for row in zip(*columns)]
+        return result
+
+    @staticmethod
+    def forecast_capacity_exhaustion(days: int = 90, min_points: int = 4, horizon_days: int = 1095,
+                                     batch_size: int = 1000) -> int:
+        """Project when each license will run out of seats
+
+        Consumption growth is fitted per license from the ``consumed`` metric
+        history. Licenses with fewer than ``min_points`` history points fall
+        back to the cumulative instance start dates within the window. All
+        fits run as one vectorized batch; the projected exhaustion date and a
+        0-1 confidence (r² weighted by sample size) are stored on each license.
+        """
+        now = timezone.now()
+        today = now.date()
+
+        portfolio = np.array(
+            License.objects.order_by('pk').values_list('pk', 'total_licenses', 'consumed_licenses'),
+            dtype=np.int64
+        ).reshape(-1, 3)
+        if not len(portfolio):
+            return 0
+        pks, total, consumed = portfolio.T
+
+        slope = np.zeros(len(pks))
+        confidence = np.zeros(len(pks))
+        fitted = np.zeros(len(pks), dtype=bool)
+
+        def apply_fit(ids, x, y, penalty=1.0):
+            fit = AnalyticsService._grouped_linear_fit(ids, x, y)
+            usable = fit['counts'] >= min_points
+            positions = np.searchsorted(pks, fit['license_ids'][usable])
+            n = fit['counts'][usable].astype(float)
+            slope[positions] = fit['slope'][usable]
+            confidence[positions] = fit['r_squared'][usable] * n / (n + min_points) * penalty
+            fitted[positions] = True
+
+        # Consumption history, read at daily resolution where rollups exist
+        _, ids, x, y = AnalyticsService.load_metric_series('consumed', days, resolution=timedelta(days=1))
+        if len(ids):
+            apply_fit(ids, x, y)
+
+        # Thin history: cumulative instance starts over the window, closed with a point for today
+        thin = pks[~fitted].tolist()
+        rows = []
+        if thin:
+            rows = list(LicenseInstance.objects.filter(
+                license_id__in=thin,
+                start_date__gte=today - timedelta(days=days),
+                start_date__lte=today
+            ).order_by('license_id', 'start_date').values_list('license_id', 'start_date'))
+        starts = np.array(rows, dtype=object).reshape(-1, 2)
+        if len(starts):
+            ids = starts[:, 0].astype(np.int64)
+            x = np.array([(start - today).days for start in starts[:, 1]], dtype=float)
+            license_ids, group_starts, counts = np.unique(ids, return_index=True, return_counts=True)
+            y = np.arange(len(ids)) - np.repeat(group_starts, counts) + 1.0
+
+            ids = np.concatenate((ids, license_ids))
+            x = np.concatenate((x, np.zeros(len(license_ids))))
+            y = np.concatenate((y, counts.astype(float)))
+            order = np.lexsort((x, ids))
+            apply_fit(ids[order], x[order], y[order], penalty=0.5)
+
+        remaining = (total - consumed).astype(float)
+        days_left = np.full(len(pks), np.nan)
+        growing = slope > 0
+        days_left[growing] = np.ceil(remaining[growing] / slope[growing])
+        days_left[remaining <= 0] = 0
+        confidence[remaining <= 0] = 1
+        days_left[days_left > horizon_days] = np.nan
+
+        forecasts = []
+        for pk, days_until, score in zip(pks.tolist(), days_left.tolist(), confidence.tolist()):
+            exhausts = not np.isnan(days_until)
+            forecasts.append(License(
+                pk=pk,
+                forecast_exhaustion_date=today + timedelta(days=days_until) if exhausts else None,
+                forecast_confidence=Decimal(str(round(score, 3))) if exhausts else None,
+                forecast_updated=now,
+            ))
+
+        License.objects.bulk_update(
+            forecasts,
+            ['forecast_exhaustion_date', 'forecast_confidence', 'forecast_updated'],
+            batch_size=batch_size
+        )
+        bump_data_version(License)
+
+        logger.info(f"Forecast capacity exhaustion for {len(forecasts)} licenses")
+        return len(forecasts)
+
+    @staticmethod
+    def get_savings_opportunities(page: int = 1, per_page: int = 50, min_savings: float = 0,
+                                  threshold: int = 70, licenses=None) -> Dict:
+        """Rank license reduction opportunities across the whole portfolio
+
+        Savings are annualised from the monthly-normalised price and the
+        recommended seat count is computed in the query, so ranking, totals and
+        pagination all happen in the database. Pages are cached as the
+        ``savings_opportunities`` report, keyed on the license, instance and
+        exchange rate data versions.
+
+        ``licenses`` limits the ranking to a (filtered or permission-restricted)
+        License queryset; such rankings are specific to the caller and are not
+        cached.
+        """
+        if licenses is not None:
+            return AnalyticsService._build_savings_opportunities(page, per_page, min_savings, threshold, licenses)
+        return get_report(
+            'savings_opportunities',
+            (License, LicenseInstance, ExchangeRate),
+            lambda: AnalyticsService._build_savings_opportunities(page, per_page, min_savings, threshold),
+            vary=(threshold, min_savings, page, per_page),
+        )
+
+    @staticmethod
+    def _build_savings_opportunities(page: int, per_page: int, min_savings: float, threshold: int,
+                                     licenses=None) -> Dict:
+        candidates = License.objects.all()
+        if licenses is not None:
+            candidates = candidates.filter(pk__in=licenses.values('pk'))
+
+        opportunities = candidates.filter(
             total_licenses__gt=0,
-            consumed_licenses__lt=F('total_licenses') * 70 / 100  # Less than 70% utilized
-        ).order_by('-total_licenses')
-        
-        for license in underutilized[:10]:  # Top 10 opportunities
-            unused = license.available_licenses
-            potential_savings = unused * license.price
-            
-            recommendations.append({
-                'type': 'reduce_licenses',
-                'license': license,
-                'current_total': license.total_licenses,
-                'current_used': license.consumed_licenses,
-                'recommended_total': max(license.consumed_licenses + 2, int(license.consumed_licenses * 1.1)),
-                'potential_savings': float(potential_savings),
-                'priority': 'high' if potential_savings > 1000 else 'medium',
-                'description': f"Reduce {license.name} from {license.total_licenses} to {max(license.consumed_licenses + 2, int(license.consumed_licenses * 1.1))} licenses"
-            })
-        
-        return recommendations
+            consumed_licenses__lt=F('total_licenses') * threshold / 100
+        ).with_monthly_costs().annotate(
+            recommended_total=Greatest(F('consumed_licenses') + 2, F('consumed_licenses') * 11 / 10),
+        ).annotate(
+            potential_savings=(F('total_licenses') - F('recommended_total')) * F('monthly_price_nok') * 12,
+        ).filter(
+            potential_savings__gt=0,
+            potential_savings__gte=min_savings
+        )
+
+        totals = opportunities.aggregate(count=Count('pk'), total_savings=Sum('potential_savings'))
+        offset = (page - 1) * per_page
+        rows = opportunities.order_by('-potential_savings', 'pk').values(
+            'pk', 'name', 'vendor__name', 'billing_cycle', 'total_licenses', 'consumed_licenses',
+            'recommended_total', 'monthly_price_nok', 'potential_savings'
+        )[offset:offset + per_page]
+
+        results = [{
+            'type': 'reduce_licenses',
+            'license_id': row['pk'],
+            'license_name': row['name'],
+            'vendor': row['vendor__name'],
+            'billing_cycle': row['billing_cycle'],
+            'current_total': row['total_licenses'],
+            'current_used': row['consumed_licenses'],
+            'recommended_total': row['recommended_total'],
+            'monthly_price': float(row['monthly_price_nok']),
+            'potential_savings': float(row['potential_savings']),
+            'priority': 'high' if row['potential_savings'] > 1000 else 'medium',
+            'description': f"Reduce {row['name']} from {row['total_licenses']} to {row['recommended_total']} licenses"
+        } for row in rows]
+
+        return {
+            'count': totals['count'],
+            'page': page,
+            'per_page': per_page,
+            'num_pages': -(-totals['count'] // per_page),
+            'total_potential_savings': float(totals['total_savings'] or 0),
+            'results': results,
+        }
+
+    @staticmethod
+    def get_cost_optimization_recommendations(limit: int = 10) -> List[Dict]:
+        """Generate cost optimization recommendations (the top ranked savings opportunities)"""
+        return AnalyticsService.get_savings_opportunities(per_page=limit)['results']
 
 
+@instrumented
 class CostAllocationService:
     """Service for automated cost allocation and chargeback"""
     
+    @staticmethod
+    def _month_bounds(month: date):
+        """First and last day of the month containing ``month``"""
+        from dateutil.relativedelta import relativedelta
+
+        month_start = month.replace(day=1)
+        return month_start, month_start + relativedelta(months=1) - timedelta(days=1)
+
+    @staticmethod
+    def get_allocation_costs(month: date):
+        """Allocated cost of every allocation active during ``month``, in one query
+
+        The license cost is the monthly-normalised NOK price of the license's
+        instances active during the month. Open-ended allocations are included.
+        """
+        month_start, month_end = CostAllocationService._month_bounds(month)
+
+        license_cost = LicenseInstance.objects.filter(
+            license=OuterRef('license_id')
+        ).filter(
+            Q(start_date__isnull=True) | Q(start_date__lte=month_end),
+            Q(end_date__isnull=True) | Q(end_date__gte=month_start)
+        ).order_by().values('license').annotate(
+            cost=Sum(instance_monthly_cost_expression())
+        ).values('cost')
+
+        return CostAllocation.objects.overlapping(month_start, month_end).annotate(
+            license_cost=Coalesce(Subquery(license_cost), Value(Decimal('0')), output_field=DecimalField()),
+        ).annotate(
+            allocated_cost=F('license_cost') * F('percentage') / Value(Decimal('100')),
+        )
+
+    @staticmethod
+    def close_month(month: date, batch_size: int = 5000) -> int:
+        """Persist every allocation's chargeback for ``month`` into the ledger
+
+        The month is recorded as a ChargebackPeriod even when it has no
+        allocations. Raises ValueError if the month has not ended yet or has
+        already been closed.
+        """
+        month_start, month_end = CostAllocationService._month_bounds(month)
+        if month_end >= timezone.localdate():
+            raise ValueError(f"Chargeback for {month_start:%Y-%m} cannot be closed before the month has ended")
+
+        with transaction.atomic():
+            rows = list(CostAllocationService.get_allocation_costs(month_start).values_list(
+                'pk', 'license_id', 'license__name', 'allocation_type', 'allocation_target',
+                'percentage', 'license_cost', 'allocated_cost'
+            ))
+            try:
+                # The unique month also stops concurrent closes of the same month
+                with transaction.atomic():
+                    ChargebackPeriod.objects.create(
+                        month=month_start,
+                        entry_count=len(rows),
+                        total_cost=sum((row[-1] for row in rows), Decimal('0')),
+                    )
+            except IntegrityError:
+                raise ValueError(f"Chargeback for {month_start:%Y-%m} is already closed")
+
+            entries = ChargebackEntry.objects.bulk_create([
+                ChargebackEntry(
+                    month=month_start,
+                    allocation_id=allocation_id,
+                    license_id=license_id,
+                    license_name=license_name,
+                    allocation_type=allocation_type,
+                    allocation_target=allocation_target,
+                    percentage=percentage,
+                    license_cost=license_cost,
+                    allocated_cost=allocated_cost,
+                )
+                for (allocation_id, license_id, license_name, allocation_type, allocation_target,
+                     percentage, license_cost, allocated_cost) in rows
+            ], batch_size=batch_size)
+            bump_data_version(ChargebackPeriod, ChargebackEntry)
+
+        logger.info(f"Closed chargeback for {month_start:%Y-%m}: {len(entries)} ledger entries")
+        return len(entries)
+
+    @staticmethod
+    def close_months(first: date, last: date, batch_size: int = 5000) -> Dict[date, int]:
+        """Close every open month from ``first`` to ``last`` inclusive
+
+        Months already closed are skipped. Returns the number of entries
+        written per closed month. Raises ValueError if ``last`` has not ended.
+        """
+        from dateutil.relativedelta import relativedelta
+
+        month, last = first.replace(day=1), last.replace(day=1)
+        closed = set(ChargebackPeriod.objects.filter(
+            month__gte=month, month__lte=last
+        ).values_list('month', flat=True))
+
+        results = {}
+        while month <= last:
+            if month not in closed:
+                results[month] = CostAllocationService.close_month(month, batch_size=batch_size)
+            month += relativedelta(months=1)
+        return results
+
+    @staticmethod
+    def is_month_closed(month: date) -> bool:
+        return ChargebackPeriod.objects.filter(month=month.replace(day=1)).exists()
+
+    @staticmethod
+    def get_chargeback_report(month: date) -> List[Dict]:
+        """Per-target totals for a closed month, read from the ledger"""
+        return list(ChargebackEntry.objects.filter(
+            month=month.replace(day=1)
+        ).values('allocation_type', 'allocation_target').annotate(
+            total_cost=Sum('allocated_cost'),
+            license_count=Count('license_id', distinct=True)
+        ).order_by('-total_cost'))
+
     @staticmethod
     def calculate_department_costs(department: str, month: Optional[date] = None) -> Dict:
-        """Calculate total license costs for a department in a given month"""
+        """Calculate total license costs for a department in a given month
+
+        Closed months are read from the chargeback ledger; open months are
+        computed live with the same allocation cost query.
+        """
         if month is None:
             month = timezone.now().date().replace(day=1)
-        
-        # Find active allocations for the department in the given month
-        allocations = CostAllocation.objects.filter(
-            allocation_target=department,
-            effective_from__lte=month,
-            effective_to__gte=month
-        ).select_related('license')
-        
+        month = month.replace(day=1)
+
+        if CostAllocationService.is_month_closed(month):
+            rows = ChargebackEntry.objects.filter(
+                month=month,
+                allocation_target=department
+            ).select_related('license')
+        else:
+            rows = CostAllocationService.get_allocation_costs(month).filter(
+                allocation_target=department
+            ).select_related('license')
+
         total_cost = Decimal('0.0')
         license_costs = []
-        
-        for allocation in allocations:
-            license_cost = allocation.license.total_cost or Decimal('0.0')
-            allocated_cost = license_cost * (allocation.percentage / 100)
-            total_cost += allocated_cost
-            
+
+        for row in rows:
+            total_cost += row.allocated_cost
+
             license_costs.append({
-                'license': allocation.license,
-                'total_cost': float(license_cost),
-                'percentage': float(allocation.percentage),
-                'allocated_cost': float(allocated_cost)
+                'license': row.license,
+                'total_cost': float(row.license_cost),
+                'percentage': float(row.percentage),
+                'allocated_cost': float(row.allocated_cost)
             })
-        
+
         return {
             'department': department,
             'month': month,
@@ -361,7 +979,7 @@ class CostAllocationService:
             'license_breakdown': license_costs,
             'license_count': len(license_costs)
         }
-    
+
     @staticmethod
     def auto_allocate_unassigned_licenses():
         """Automatically allocate licenses that don't have cost allocations"""
@@ -385,4 +1003,185 @@ class CostAllocationService:
             )
             allocations_created += 1
         
-        return allocations_created
\ No newline at end of file
+        return allocations_created
+
+@instrumented
+class LicenseInstanceBulkService:
+    """Set-based helpers for writing many license instances at once
+
+    Callers run inside bulk_instance_changes() so per-row capacity checks and
+    consumed_licenses recounts are skipped, then use these helpers to do that
+    work once per affected license.
+    """
+
+    @staticmethod
+    def check_capacity(additions: Dict[int, int]) -> Dict[int, str]:
+        """Errors keyed by license ID for licenses that cannot take the added instances
+
+        ``additions`` maps license ID to the net number of instances being added.
+        """
+        errors = {}
+        licenses = License.objects.filter(
+            pk__in=[pk for pk, added in additions.items() if added > 0]
+        ).annotate(instance_total=Count('instances'))
+
+        for license in licenses:
+            if license.instance_total + additions[license.pk] > license.total_licenses:
+                errors[license.pk] = (
+                    f"Cannot add {additions[license.pk]} instance(s) to {license.name}. This would exceed "
+                    f"the total available licenses ({license.total_licenses}). "
+                    f"Current instances: {license.instance_total}"
+                )
+        return errors
+
+    @staticmethod
+    def refresh_consumed_licenses(license_ids) -> int:
+        """Recount consumed_licenses for the given licenses in a single UPDATE"""
+        instance_count = LicenseInstance.objects.filter(
+            license=OuterRef('pk')
+        ).order_by().values('license').annotate(total=Count('pk')).values('total')
+
+        updated = License.objects.filter(pk__in=license_ids).update(
+            consumed_licenses=Coalesce(Subquery(instance_count), Value(0))
+        )
+        bump_data_version(License)
+        return updated
+
+    @staticmethod
+    def log_changes(instances: List[LicenseInstance], action: str, request=None) -> None:
+        """Write the change log records that save() would have produced, in one INSERT"""
+        import uuid
+        from django.db.models import prefetch_related_objects
+        from core.models import ObjectChange
+
+        prefetch_related_objects(instances, 'tags')
+        request_id = getattr(request, 'id', None) or uuid.uuid4()
+        user = request.user if request is not None and request.user.is_authenticated else None
+
+        changes = []
+        for instance in instances:
+            change = instance.to_objectchange(action)
+            change.request_id = request_id
+            if user is not None:
+                change.user = user
+                change.user_name = user.username
+            changes.append(change)
+        ObjectChange.objects.bulk_create(changes)
+
+    @staticmethod
+    def set_assignment_display(instances: List[LicenseInstance]) -> None:
+        """Fill in the denormalized assignment fields, loading assigned objects per content type"""
+        from collections import defaultdict
+        from django.contrib.contenttypes.models import ContentType
+
+        ids_by_type = defaultdict(set)
+        for instance in instances:
+            if instance.assigned_object_type_id and instance.assigned_object_id:
+                ids_by_type[instance.assigned_object_type_id].add(instance.assigned_object_id)
+
+        objects = {}
+        for type_id, ids in ids_by_type.items():
+            model = ContentType.objects.get_for_id(type_id).model_class()
+            if model is not None:
+                for pk, obj in model._default_manager.in_bulk(ids).items():
+                    objects[(type_id, pk)] = obj
+
+        for instance in instances:
+            content_type = (
+                ContentType.objects.get_for_id(instance.assigned_object_type_id)
+                if instance.assigned_object_type_id else None
+            )
+            instance.assigned_object_type_name = assigned_object_type_label(content_type)
+            instance.assigned_object_name = assigned_object_display_name(
+                objects.get((instance.assigned_object_type_id, instance.assigned_object_id))
+            )
+
+    @staticmethod
+    def backfill_assignment_display(batch_size: int = 5000) -> int:
+        """Recompute the denormalized assignment fields of every license instance
+
+        Runs one UPDATE per assigned content type, copying the name column of
+        the target table; targets without a usable name column (or unnamed
+        rows such as devices without a name) are resolved in Python.
+        """
+        from django.contrib.contenttypes.models import ContentType
+
+        updated = 0
+        type_ids = LicenseInstance.objects.order_by().values_list('assigned_object_type', flat=True).distinct()
+
+        with transaction.atomic():
+            for content_type in ContentType.objects.filter(pk__in=list(type_ids)):
+                instances = LicenseInstance.objects.filter(assigned_object_type=content_type)
+                name_field = assigned_object_name_field(content_type)
+
+                if name_field is not None:
+                    updated += update_assignment_display(instances, content_type, content_type.model_class())
+                    # Unnamed objects fall back to str(obj)
+                    instances = instances.filter(assigned_object_name='')
+
+                pending = list(instances.only('pk', 'assigned_object_type', 'assigned_object_id'))
+                for offset in range(0, len(pending), batch_size):
+                    batch = pending[offset:offset + batch_size]
+                    LicenseInstanceBulkService.set_assignment_display(batch)
+                    LicenseInstance.objects.bulk_update(
+                        batch, ['assigned_object_type_name', 'assigned_object_name'], batch_size=batch_size
+                    )
+                if name_field is None:
+                    updated += len(pending)
+
+            bump_data_version(LicenseInstance)
+
+        return updated
+
+    @staticmethod
+    def update_search_cache(instances: List[LicenseInstance]) -> None:
+        """Refresh the global search cache, which bulk writes bypass, for ``instances``"""
+        from netbox.search.backends import search_backend
+
+        search_backend.cache(instances, remove_existing=True)
+
+    @staticmethod
+    def get_licenses_by_object(instances, content_type, object_ids) -> Dict[int, Dict]:
+        """Licenses, costs and statuses of many assigned objects of one type, in a single query
+
+        ``instances`` is the (permission-restricted) LicenseInstance queryset to
+        read from; the lookup is served by the (assigned_object_type,
+        assigned_object_id) index. Every requested ID is present in the result,
+        with an empty license list if nothing is assigned to it.
+        """
+        object_ids = sorted(set(object_ids))
+        rows = instances.filter(
+            assigned_object_type=content_type, assigned_object_id__in=object_ids
+        ).annotate(
+            price_nok=instance_nok_price_expression(),
+            monthly_cost=instance_monthly_cost_expression(),
+            status=instance_status_expression(),
+            effective_auto_renew=Coalesce('auto_renew', 'license__auto_renew'),
+        ).order_by('assigned_object_id', 'license__name', 'pk').values(
+            'pk', 'assigned_object_id', 'assigned_object_name', 'license_id', 'license__name',
+            'license__vendor__name', 'license__billing_cycle', 'start_date', 'end_date',
+            'effective_auto_renew', 'price_nok', 'monthly_cost', 'status',
+        )
+
+        results = {
+            object_id: {'name': '', 'monthly_cost': Decimal('0'), 'licenses': []}
+            for object_id in object_ids
+        }
+        for row in rows:
+            entry = results[row['assigned_object_id']]
+            entry['name'] = entry['name'] or row['assigned_object_name']
+            entry['monthly_cost'] += row['monthly_cost']
+            entry['licenses'].append({
+                'instance_id': row['pk'],
+                'license_id': row['license_id'],
+                'license': row['license__name'],
+                'vendor': row['license__vendor__name'],
+                'billing_cycle': row['license__billing_cycle'],
+                'price_nok': row['price_nok'],
+                'monthly_cost': row['monthly_cost'],
+                'status': row['status'],
+                'start_date': row['start_date'],
+                'end_date': row['end_date'],
+                'auto_renew': row['effective_auto_renew'],
+            })
+        return results
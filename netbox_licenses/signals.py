@@ -1,6 +1,13 @@
+from django.contrib.contenttypes.models import ContentType
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import LicenseInstance
+from netbox.plugins import get_plugin_config
+from dcim.models import Device
+from ipam.models import Service
+from tenancy.models import Contact, Tenant
+from virtualization.models import VirtualMachine
+from .caching import bump_data_version
+from .models import ExchangeRate, LicenseInstance, assigned_object_display_name, in_bulk_instance_changes
 
 
 @receiver([post_save, post_delete], sender=LicenseInstance)
@@ -10,11 +17,68 @@ def update_consumed_licenses(sender, instance, **kwargs):
     
     This signal handler ensures that the License.consumed_licenses field
     is always accurate and reflects the current number of LicenseInstance
-    objects assigned to each license.
+    objects assigned to each license. Bulk writes recount once per license
+    instead (see LicenseInstanceBulkService.refresh_consumed_licenses).
+    Off unless ``auto_calculate_utilization`` is set to True, since this
+    receiver was never connected before ready() imported this module.
     """
+    if in_bulk_instance_changes():
+        return
+    if not get_plugin_config('netbox_licenses', 'auto_calculate_utilization', False):
+        return
+
     if instance.license:
         license = instance.license
         # Count all instances for this license
         license.consumed_licenses = license.instances.count()
         # Use update_fields to avoid triggering other signals
-        license.save(update_fields=['consumed_licenses'])
\ No newline at end of file
+        license.save(update_fields=['consumed_licenses'])
+
+
+@receiver([post_save, post_delete], sender=ExchangeRate)
+def invalidate_exchange_rates(sender, instance, **kwargs):
+    """Drop this process's cached rate table so the next conversion reloads it"""
+    ExchangeRate.clear_cache()
+
+
+@receiver([post_save, post_delete])
+def bump_model_data_version(sender, **kwargs):
+    """Invalidate ETags for responses built from the changed plugin model"""
+    if sender._meta.app_label == 'netbox_licenses':
+        bump_data_version(sender)
+
+
+def _sync_assignment_display(model, pk, name):
+    """Rewrite the denormalized name on every instance assigned to one object"""
+    from .services import LicenseInstanceBulkService
+
+    instances = LicenseInstance.objects.filter(
+        assigned_object_type=ContentType.objects.get_for_model(model),
+        assigned_object_id=pk,
+    )
+    # The update bypasses save(), so refresh the data version and search cache here
+    if instances.exclude(assigned_object_name=name).update(assigned_object_name=name):
+        bump_data_version(LicenseInstance)
+        LicenseInstanceBulkService.update_search_cache(list(instances))
+
+
+@receiver(post_save, sender=Contact)
+@receiver(post_save, sender=Device)
+@receiver(post_save, sender=Service)
+@receiver(post_save, sender=Tenant)
+@receiver(post_save, sender=VirtualMachine)
+def rename_assigned_object(sender, instance, created=False, raw=False, **kwargs):
+    """Follow renames of objects that licenses can be assigned to"""
+    if created or raw:
+        return
+    _sync_assignment_display(sender, instance.pk, assigned_object_display_name(instance))
+
+
+@receiver(post_delete, sender=Contact)
+@receiver(post_delete, sender=Device)
+@receiver(post_delete, sender=Service)
+@receiver(post_delete, sender=Tenant)
+@receiver(post_delete, sender=VirtualMachine)
+def clear_deleted_assigned_object(sender, instance, **kwargs):
+    """Blank the name of deleted assigned objects; the instances themselves are kept"""
+    _sync_assignment_display(sender, instance.pk, '')
@@ -1,7 +1,7 @@
 import django_tables2 as tables
 
 from netbox.tables import NetBoxTable, ChoiceFieldColumn
-from .models import License, LicenseInstance
+from .models import ExchangeRate, License, LicenseInstance
 from .choices import LicenseStatusChoices
 
 class LicenseTable(NetBoxTable):
@@ -20,14 +20,20 @@ class LicenseTable(NetBoxTable):
     # COST COLUMNS
     price = tables.Column(verbose_name="Unit Price", empty_values=())
     currency = tables.Column(verbose_name="Currency")
+    monthly_price = tables.Column(verbose_name="Monthly Price")
     total_cost = tables.Column(empty_values=(), verbose_name="Total Cost (NOK)")
 
+    # FORECAST COLUMNS
+    forecast_exhaustion_date = tables.DateColumn(format='d/m/Y', verbose_name="Projected Exhaustion")
+    forecast_confidence = tables.Column(verbose_name="Forecast Confidence")
+
     class Meta(NetBoxTable.Meta):
         model = License
         fields = (
             "pk", "name", "vendor", "tenant", "external_id",
             "utilization", "total_licenses", "consumed_licenses", "available_licenses",
-            "price", "currency", "total_cost",
+            "price", "currency", "monthly_price", "total_cost",
+            "forecast_exhaustion_date", "forecast_confidence",
             "tags", "created", "last_updated", "actions"
         )
         default_columns = (
@@ -59,31 +65,44 @@ class LicenseTable(NetBoxTable):
         price_value = float(record.price) if record.price else 0
         return "{} {}".format(price_value, record.currency)
 
+    def render_monthly_price(self, record):
+        return "{:.2f} {}".format(float(record.monthly_price), record.currency)
+
     def render_total_cost(self, record):
         cost_value = float(str(record.total_cost)) if record.total_cost else 0
         return "{:.2f} NOK".format(cost_value)
 
+    def render_forecast_confidence(self, value):
+        return "{:.0f}%".format(float(value) * 100)
+
 class LicenseInstanceTable(NetBoxTable):
     pk = tables.CheckBoxColumn()
     license = tables.Column(linkify=True)
-    assigned_object = tables.Column(verbose_name="Assigned To", orderable=False)
+    assigned_object = tables.Column(
+        verbose_name="Assigned To",
+        accessor='assigned_object_name',
+        order_by=('assigned_object_name',)
+    )
+    assigned_object_type_name = tables.Column(verbose_name="Assigned Type")
     start_date = tables.DateColumn(format='d/m/Y')
     end_date = tables.DateColumn(format='d/m/Y')
     status = tables.Column(verbose_name="Status", orderable=False, accessor='derived_status')
     auto_renew_status = tables.Column(empty_values=(), verbose_name="Auto-Renew", orderable=False)
     instance_price_nok = tables.Column(empty_values=(), verbose_name="Price (NOK)")
 
-    def render_assigned_object(self, record):
-        """Render assigned object with proper link"""
-        if record.assigned_object:
-            url = getattr(record.assigned_object, 'get_absolute_url', lambda: '#')()
-            return format_html('<a href="{}">{}</a>', url, record.assigned_object)
-        return "—"
+    def render_assigned_object(self, record, value):
+        """Render the denormalized assigned object name, linked without loading the object"""
+        from django.utils.html import format_html
+
+        url = record.get_assigned_object_url()
+        if url:
+            return format_html('<a href="{}">{}</a>', url, value)
+        return value
 
     class Meta(NetBoxTable.Meta):
         model = LicenseInstance
         fields = (
-            'pk', 'id', 'license', 'assigned_object', 'start_date', 'end_date', 'status',
+            'pk', 'id', 'license', 'assigned_object', 'assigned_object_type_name', 'start_date', 'end_date', 'status',
             'auto_renew_status', 'instance_price_nok', 'actions'
         )
         default_columns = (
@@ -126,3 +145,15 @@ class LicenseInstanceTable(NetBoxTable):
             LicenseStatusChoices.CSS_CLASSES.get(status, "secondary"),
             dict(LicenseStatusChoices.CHOICES).get(status, status)
         )
+
+
+class ExchangeRateTable(NetBoxTable):
+    pk = tables.CheckBoxColumn()
+    currency = tables.Column(linkify=True)
+    rate_to_nok = tables.Column(verbose_name="Rate to NOK")
+    effective_date = tables.DateColumn(format='d/m/Y', verbose_name="Effective From")
+
+    class Meta(NetBoxTable.Meta):
+        model = ExchangeRate
+        fields = ('pk', 'id', 'currency', 'rate_to_nok', 'effective_date', 'comments', 'actions')
+        default_columns = ('pk', 'currency', 'rate_to_nok', 'effective_date')
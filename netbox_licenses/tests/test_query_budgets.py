@@ -0,0 +1,41 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from netbox_licenses.management.commands.license_benchmark import Command as BenchmarkCommand
+
+
+class QueryBudgetTestCase(TestCase):
+    """Run every benchmark case against a small seeded dataset and fail on budget overruns
+
+    Budgets are fixed query counts, so a query issued per row fails here at
+    the 1k scale just as it would in production.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            'license_seed', scale='1k', instances=300, devices=60, virtual_machines=60, contacts=60,
+            analytics_days=10, stdout=StringIO(),
+        )
+        cls.user = get_user_model().objects.create_superuser('benchmark', 'benchmark@example.com', 'benchmark')
+
+    def test_query_budgets(self):
+        command = BenchmarkCommand(stdout=StringIO(), stderr=StringIO())
+        try:
+            call_command(command, user=self.user.username, repeat=2)
+        except CommandError as e:
+            # Budget overruns are reported per case below; anything else is a failure of its own
+            if not str(e).startswith('Query budget exceeded'):
+                raise
+
+        self.assertTrue(command.results)
+        for result in command.results:
+            with self.subTest(result['name']):
+                self.assertFalse(
+                    result['over_budget'],
+                    f"{result['queries']} queries, budget {result['query_budget']}"
+                )
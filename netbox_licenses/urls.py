@@ -30,6 +30,17 @@ urlpatterns = [
     }),
     path('license-instances/delete/', views.LicenseInstanceBulkDeleteView.as_view(), name="licenseinstance_bulk_delete"),
 
+    # Exchange Rates
+    path('exchange-rates/', views.ExchangeRateListView.as_view(), name='exchangerate_list'),
+    path('exchange-rates/add/', views.ExchangeRateEditView.as_view(), name='exchangerate_add'),
+    path('exchange-rates/<int:pk>/', views.ExchangeRateView.as_view(), name='exchangerate'),
+    path('exchange-rates/<int:pk>/edit/', views.ExchangeRateEditView.as_view(), name='exchangerate_edit'),
+    path('exchange-rates/<int:pk>/delete/', views.ExchangeRateDeleteView.as_view(), name='exchangerate_delete'),
+    path('exchange-rates/<int:pk>/changelog', ObjectChangeLogView.as_view(), name='exchangerate_changelog', kwargs={
+        'model': models.ExchangeRate
+    }),
+    path('exchange-rates/delete/', views.ExchangeRateBulkDeleteView.as_view(), name='exchangerate_bulk_delete'),
+
     # Reporting views
     path('reports/utilization/', views.UtilizationReportView.as_view(), name='utilization_report'),
     path('reports/vendor-utilization/', views.VendorUtilizationView.as_view(), name='vendor_utilization'),
@@ -5,12 +5,14 @@ from netbox.views import generic
 from . import tables, filtersets, models, forms
 from django.shortcuts import get_object_or_404, redirect
 from django.db.models import Count, Q, F, Sum
+from django.db.models.functions import Coalesce
 from django.contrib import messages
 from django.http import HttpResponseBadRequest
 from utilities.forms.fields import DynamicModelChoiceField
 from django.utils import timezone
 from datetime import timedelta
 from dcim.models import Manufacturer
+from .caching import cached_report
 
 
 # Dashboard view
@@ -19,6 +21,10 @@ class LicenseDashboardView(View):
     template_name = "netbox_licenses/dashboard.html"
 
     def get(self, request):
+        return render(request, self.template_name, self.get_report_context(request))
+
+    @cached_report('dashboard', models.License, models.LicenseInstance, models.ExchangeRate)
+    def get_report_context(self, request):
         # Get all licenses
         licenses = models.License.objects.all()
         instances = models.LicenseInstance.objects.all()
@@ -81,24 +87,31 @@ class LicenseDashboardView(View):
         # Sort vendor stats by total licenses descending
         vendor_stats.sort(key=lambda x: x['total_licenses'], reverse=True)
 
-        # Overall statistics
-        total_licenses_count = sum(l.total_licenses for l in licenses)
-        total_consumed = sum(l.consumed_licenses for l in licenses)
+        # Overall statistics and subscription commitments (NOK), aggregated in one query
+        totals = licenses.with_monthly_costs().aggregate(
+            total_licenses=Coalesce(Sum('total_licenses'), 0),
+            total_consumed=Coalesce(Sum('consumed_licenses'), 0),
+            monthly_commitment=Sum('monthly_commitment'),
+            auto_renewing_count=Count('pk', filter=Q(auto_renew=True)),
+            manual_renewal_count=Count('pk', filter=Q(auto_renew=False)),
+            # Simple MRC tracking - Monthly Recurring Cost
+            current_mrc=Sum('monthly_consumed_cost', filter=Q(auto_renew=True)),
+            potential_mrc=Sum('monthly_commitment', filter=Q(auto_renew=True)),
+            manual_monthly_cost=Sum('monthly_consumed_cost', filter=Q(auto_renew=False)),
+        )
+        total_licenses_count = totals['total_licenses']
+        total_consumed = totals['total_consumed']
         total_available = total_licenses_count - total_consumed
 
         # Calculate total value in NOK
         total_value_nok = sum(stat['total_price_nok'] for stat in vendor_stats)
 
-        # Calculate subscription commitments
-        total_monthly_commitment = sum(l.total_monthly_commitment for l in licenses)
-        total_yearly_commitment = sum(l.total_yearly_commitment for l in licenses)
-        auto_renewing_licenses = licenses.filter(auto_renew=True)
-        auto_renewing_monthly = sum(l.monthly_equivalent_price * l.total_licenses for l in auto_renewing_licenses)
-
-        # Simple MRC tracking - Monthly Recurring Cost
-        current_mrc = sum(l.total_monthly_consumed_cost for l in auto_renewing_licenses)
-        potential_mrc = sum(l.total_monthly_commitment for l in auto_renewing_licenses)
-        manual_monthly_cost = sum(l.total_monthly_consumed_cost for l in licenses.filter(auto_renew=False))
+        total_monthly_commitment = float(totals['monthly_commitment'] or 0)
+        total_yearly_commitment = total_monthly_commitment * 12
+        current_mrc = float(totals['current_mrc'] or 0)
+        potential_mrc = float(totals['potential_mrc'] or 0)
+        auto_renewing_monthly = potential_mrc
+        manual_monthly_cost = float(totals['manual_monthly_cost'] or 0)
 
         context = {
             # Pie chart data for expiration status
@@ -126,8 +139,8 @@ class LicenseDashboardView(View):
                 'total_monthly_commitment': total_monthly_commitment,
                 'total_yearly_commitment': total_yearly_commitment,
                 'auto_renewing_monthly': auto_renewing_monthly,
-                'auto_renewing_count': auto_renewing_licenses.count(),
-                'manual_renewal_count': licenses.filter(auto_renew=False).count(),
+                'auto_renewing_count': totals['auto_renewing_count'],
+                'manual_renewal_count': totals['manual_renewal_count'],
                 # Simple MRC metrics
                 'current_mrc': current_mrc,
                 'potential_mrc': potential_mrc,
@@ -136,7 +149,7 @@ class LicenseDashboardView(View):
             }
         }
 
-        return render(request, self.template_name, context)
+        return context
 
 
 # Assigned Object Cost Attribution View
@@ -145,68 +158,50 @@ class AssignedObjectCostView(View):
     template_name = "netbox_licenses/assigned_object_costs.html"
 
     def get(self, request):
-        # Get all license instances grouped by assigned object
-        instances = models.LicenseInstance.objects.select_related(
-            'license', 'license__vendor', 'assigned_object_type'
-        ).filter(assigned_object_id__isnull=False)
+        from collections import defaultdict
 
-        # Group by content type and object
-        object_costs = {}
+        # Monthly NOK cost per instance, normalised from the billing cycle in SQL
+        instances = models.LicenseInstance.objects.select_related(
+            'license', 'license__vendor'
+        ).filter(
+            assigned_object_id__isnull=False
+        ).annotate(
+            monthly_cost=models.instance_monthly_cost_expression()
+        ).order_by('-monthly_cost')
+
+        # Per-object totals, ranked by the database. Names come from the denormalized
+        # assignment fields, so the assigned objects themselves are never loaded.
+        object_totals = models.LicenseInstance.objects.filter(
+            assigned_object_id__isnull=False
+        ).exclude(
+            assigned_object_name=''  # Skip objects that no longer exist
+        ).values(
+            'assigned_object_type', 'assigned_object_id', 'assigned_object_name', 'assigned_object_type_name'
+        ).annotate(
+            license_count=Count('pk'),
+            total_monthly_cost=Sum(models.instance_monthly_cost_expression())
+        ).order_by('-total_monthly_cost')
+
+        instances_by_object = defaultdict(list)
         for instance in instances:
-            content_type = instance.assigned_object_type
-            object_id = instance.assigned_object_id
-
-            if content_type.id not in object_costs:
-                object_costs[content_type.id] = {
-                    'content_type': content_type,
-                    'objects': {}
-                }
-
-            if object_id not in object_costs[content_type.id]['objects']:
-                # Get the actual object
-                try:
-                    obj = content_type.get_object_for_this_type(pk=object_id)
-                    object_costs[content_type.id]['objects'][object_id] = {
-                        'object': obj,
-                        'instances': [],
-                        'total_monthly_cost': 0,
-                        'license_count': 0
-                    }
-                except:
-                    continue  # Skip if object no longer exists
-
-            obj_data = object_costs[content_type.id]['objects'][object_id]
-            obj_data['instances'].append(instance)
-            obj_data['license_count'] += 1
-
-            # Calculate monthly cost for this instance
-            monthly_cost = instance.license.monthly_equivalent_price
-            if instance.nok_price_override:
-                # Convert NOK price to monthly equivalent if needed
-                if instance.license.billing_cycle == 'yearly':
-                    monthly_cost = float(instance.nok_price_override) / 12
-                elif instance.license.billing_cycle == 'quarterly':
-                    monthly_cost = float(instance.nok_price_override) / 3
-                else:
-                    monthly_cost = float(instance.nok_price_override)
+            instances_by_object[(instance.assigned_object_type_id, instance.assigned_object_id)].append(instance)
 
-            obj_data['total_monthly_cost'] += monthly_cost
-
-        # Convert to list and sort by cost
         cost_attribution = []
-        for content_type_data in object_costs.values():
-            for obj_data in content_type_data['objects'].values():
-                cost_attribution.append({
-                    'content_type': content_type_data['content_type'],
-                    'object': obj_data['object'],
-                    'license_count': obj_data['license_count'],
-                    'total_monthly_cost': obj_data['total_monthly_cost'],
-                    'total_yearly_cost': obj_data['total_monthly_cost'] * 12,
-                    'instances': obj_data['instances']
-                })
-
-        # Sort by monthly cost descending
-        cost_attribution.sort(key=lambda x: x['total_monthly_cost'], reverse=True)
+        for row in object_totals:
+            key = (row['assigned_object_type'], row['assigned_object_id'])
+            object_instances = instances_by_object[key]
+            monthly_cost = float(row['total_monthly_cost'] or 0)
+            cost_attribution.append({
+                'type_label': row['assigned_object_type_name'],
+                'content_type_id': row['assigned_object_type'],
+                'object_id': row['assigned_object_id'],
+                'name': row['assigned_object_name'],
+                'url': object_instances[0].get_assigned_object_url() if object_instances else None,
+                'license_count': row['license_count'],
+                'total_monthly_cost': monthly_cost,
+                'total_yearly_cost': monthly_cost * 12,
+                'instances': object_instances
+            })
 
         context = {
             'cost_attribution': cost_attribution,
@@ -229,7 +224,8 @@ class LicenseListView(generic.ObjectListView):
     filterset_form = filtersets.LicenseFilterForm
 
 class LicenseView(generic.ObjectView):
-    queryset = models.License.objects.prefetch_related('instances', 'instances__assigned_object')
+    # Instance rows show the denormalized assignment names, so the assigned objects are never loaded
+    queryset = models.License.objects.prefetch_related('instances')
 
     def get_extra_context(self, request, instance):
         return {
@@ -273,13 +269,13 @@ class LicenseBulkDeleteView(generic.BulkDeleteView):
 
 # LicenseInstance views
 class LicenseInstanceListView(generic.ObjectListView):
-    queryset = models.LicenseInstance.objects.prefetch_related('license', 'assigned_object')
+    queryset = models.LicenseInstance.objects.select_related('license')
     table = tables.LicenseInstanceTable
     filterset = filtersets.LicenseInstanceFilterSet
     filterset_form = filtersets.LicenseInstanceFilterForm
 
 class LicenseInstanceView(generic.ObjectView):
-    queryset = models.LicenseInstance.objects.prefetch_related('license', 'assigned_object')
+    queryset = models.LicenseInstance.objects.select_related('license')
 
 class LicenseInstanceEditView(generic.ObjectEditView):
     queryset = models.LicenseInstance.objects.all()
@@ -373,12 +369,43 @@ class LicenseInstanceBulkDeleteView(generic.BulkDeleteView):
     queryset = models.LicenseInstance.objects.all()
     table = tables.LicenseInstanceTable
 
+# Exchange Rate Views
+class ExchangeRateListView(generic.ObjectListView):
+    queryset = models.ExchangeRate.objects.all()
+    table = tables.ExchangeRateTable
+    filterset = filtersets.ExchangeRateFilterSet
+    filterset_form = filtersets.ExchangeRateFilterForm
+
+class ExchangeRateView(generic.ObjectView):
+    queryset = models.ExchangeRate.objects.all()
+
+class ExchangeRateEditView(generic.ObjectEditView):
+    queryset = models.ExchangeRate.objects.all()
+    form = forms.ExchangeRateForm
+
+class ExchangeRateDeleteView(generic.ObjectDeleteView):
+    queryset = models.ExchangeRate.objects.all()
+
+class ExchangeRateBulkDeleteView(generic.BulkDeleteView):
+    queryset = models.ExchangeRate.objects.all()
+    table = tables.ExchangeRateTable
+
 # Utilization Reporting Views
 class UtilizationReportView(View):
     """Comprehensive utilization report for license optimization"""
     template_name = "netbox_licenses/utilization_report.html"
     
     def get(self, request):
+        # The table is per-user (column preferences), so it is built outside the cached report
+        licenses = models.License.objects.prefetch_related('vendor', 'tenant', 'instances')
+        context = {
+            **self.get_report_context(request),
+            'licenses_table': tables.LicenseTable(licenses, user=request.user),
+        }
+        return render(request, self.template_name, context)
+
+    @cached_report('utilization_report', models.License, models.LicenseInstance)
+    def get_report_context(self, request):
         # Get all licenses with utilization metrics
         licenses = models.License.objects.prefetch_related('vendor', 'tenant', 'instances')
         
@@ -425,16 +452,19 @@ class UtilizationReportView(View):
             'overallocated_licenses': overallocated_licenses,
             'total_license_value': total_license_value,
             'potential_savings': potential_savings,
-            'licenses_table': tables.LicenseTable(licenses, user=request.user),
         }
         
-        return render(request, self.template_name, context)
+        return context
 
 class VendorUtilizationView(View):
     """Vendor-specific utilization analysis"""
     template_name = "netbox_licenses/vendor_utilization.html"
     
     def get(self, request):
+        return render(request, self.template_name, self.get_report_context(request))
+
+    @cached_report('vendor_utilization', models.License, models.LicenseInstance)
+    def get_report_context(self, request):
         # Get vendor utilization statistics
         vendor_stats = []
         vendors = models.License.objects.values_list('vendor', flat=True).distinct()
@@ -468,7 +498,7 @@ class VendorUtilizationView(View):
             'total_vendors': len(vendor_stats),
         }
         
-        return render(request, self.template_name, context)
+        return context
 
 
 # Phase 3: Advanced Analytics and Trend Analysis Views
@@ -477,39 +507,75 @@ class LicenseAnalyticsView(View):
     template_name = "netbox_licenses/license_analytics.html"
     
     def get(self, request):
+        return render(request, self.template_name, self.get_report_context(request))
+
+    @cached_report(
+        'license_analytics',
+        models.License,
+        models.LicenseInstance,
+        models.ExchangeRate,
+        models.LicenseAnalytics,
+        models.LicenseAnalyticsHourly,
+        models.LicenseAnalyticsDaily,
+        models.LicenseAnalyticsMonthly
+    )
+    def get_report_context(self, request):
         from .services import AnalyticsService
-        from datetime import timedelta
-        
+        from collections import Counter
+        import heapq
+
         # Get time range from query params (default: 30 days)
-        days = int(request.GET.get('days', 30))
-        
-        licenses = models.License.objects.prefetch_related('analytics', 'vendor')
-        analytics_data = []
-        
-        for license in licenses[:20]:  # Top 20 for performance
-            trend_data = {
-                'license': license,
-                'utilization_trend': AnalyticsService.get_trend_analysis(license, 'utilization', days),
-                'cost_trend': AnalyticsService.get_trend_analysis(license, 'cost', days),
-                'efficiency_trend': AnalyticsService.get_trend_analysis(license, 'efficiency', days),
-                'recent_metrics': license.analytics.filter(
-                    timestamp__gte=timezone.now() - timedelta(days=days)
-                )[:10]
-            }
-            analytics_data.append(trend_data)
-        
-        # Get optimization recommendations
-        recommendations = AnalyticsService.get_cost_optimization_recommendations()
-        
+        try:
+            days = min(max(int(request.GET.get('days', 30)), 1), 365)
+        except ValueError:
+            days = 30
+
+        # Portfolio-wide trends, computed for all licenses at once per metric
+        utilization = AnalyticsService.get_portfolio_trends('utilization', days)
+        cost_trends = {
+            row['license_id']: row for row in AnalyticsService.get_portfolio_trends('cost', days)['licenses']
+        }
+        fastest_growing = heapq.nlargest(10, utilization['licenses'], key=lambda row: row['slope_per_day'])
+        fastest_declining = heapq.nsmallest(10, utilization['licenses'], key=lambda row: row['slope_per_day'])
+
+        names = dict(
+            models.License.objects.filter(
+                pk__in={row['license_id'] for row in fastest_growing + fastest_declining}
+            ).values_list('pk', 'name')
+        )
+        for row in fastest_growing + fastest_declining:
+            row['license_name'] = names.get(row['license_id'], '')
+            row['cost_change'] = cost_trends.get(row['license_id'], {}).get('change')
+
+        portfolio_trends = {
+            'resolution': utilization['resolution'],
+            'license_count': len(utilization['licenses']),
+            'trend_counts': dict(Counter(row['trend'] for row in utilization['licenses'])),
+            'fastest_growing': fastest_growing,
+            'fastest_declining': fastest_declining,
+        }
+
+        # Ranked savings opportunities across the whole portfolio, one page at a time
+        try:
+            page = max(int(request.GET.get('page', 1)), 1)
+        except ValueError:
+            page = 1
+        opportunities = AnalyticsService.get_savings_opportunities(page=page, per_page=25)
+
         context = {
-            'analytics_data': analytics_data,
-            'recommendations': recommendations[:10],  # Top 10
+            'portfolio_trends': portfolio_trends,
+            'recommendations': opportunities['results'],
+            'recommendations_page': opportunities,
             'days_analyzed': days,
-            'total_licenses': licenses.count(),
-            'total_potential_savings': sum(r['potential_savings'] for r in recommendations),
+            'total_licenses': models.License.objects.count(),
+            'total_potential_savings': opportunities['total_potential_savings'],
         }
-        
-        return render(request, self.template_name, context)
+
+        return context
+
+
+# Licenses listed per section on the compliance dashboard
+COMPLIANCE_LIST_LIMIT = 20
 
 
 class ComplianceMonitoringView(View):
@@ -521,42 +587,49 @@ class ComplianceMonitoringView(View):
         
         # Get active alerts by type and severity
         active_alerts = LicenseAlert.objects.filter(status='active').select_related('license', 'license__vendor')
-        
-        alert_summary = {
-            'critical': active_alerts.filter(severity='critical').count(),
-            'high': active_alerts.filter(severity='high').count(),
-            'medium': active_alerts.filter(severity='medium').count(),
-            'low': active_alerts.filter(severity='low').count(),
-        }
-        
-        # Group alerts by type
+
+        # Counts per (severity, type) pair, in one query
+        severity_counts = dict.fromkeys(('critical', 'high', 'medium', 'low'), 0)
+        type_counts = {}
+        for row in active_alerts.order_by().values('severity', 'alert_type').annotate(count=Count('pk')):
+            if row['severity'] in severity_counts:
+                severity_counts[row['severity']] += row['count']
+            type_counts[row['alert_type']] = type_counts.get(row['alert_type'], 0) + row['count']
+
+        # Group alerts by type; only types with active alerts fetch their top 5
         alerts_by_type = {}
         for alert_type, display_name in LicenseAlert.ALERT_TYPES:
+            count = type_counts.get(alert_type, 0)
             alerts_by_type[alert_type] = {
                 'display_name': display_name,
-                'count': active_alerts.filter(alert_type=alert_type).count(),
-                'alerts': active_alerts.filter(alert_type=alert_type)[:5]  # Top 5 per type
+                'count': count,
+                'alerts': active_alerts.filter(alert_type=alert_type).order_by('-triggered_at')[:5] if count else [],
             }
-        
+
         # Get overallocated and underutilized licenses
         overallocated = models.License.objects.filter(
             consumed_licenses__gt=F('total_licenses')
-        )
-        
+        ).select_related('vendor')
+
         underutilized = models.License.objects.filter(
             consumed_licenses__lt=F('total_licenses') * 70 / 100,
             total_licenses__gt=0
-        )
-        
+        ).select_related('vendor')
+
         context = {
-            'alert_summary': alert_summary,
+            'alert_summary': severity_counts,
             'alerts_by_type': alerts_by_type,
             'recent_alerts': active_alerts.order_by('-triggered_at')[:10],
-            'overallocated_licenses': overallocated,
-            'underutilized_licenses': underutilized,
-            'total_active_alerts': active_alerts.count(),
+            # Most overallocated first
+            'overallocated_licenses': overallocated.order_by(
+                F('total_licenses') - F('consumed_licenses'), 'name'
+            )[:COMPLIANCE_LIST_LIMIT],
+            'overallocated_count': overallocated.count(),
+            'underutilized_licenses': underutilized.order_by('consumed_licenses', 'name')[:COMPLIANCE_LIST_LIMIT],
+            'underutilized_count': underutilized.count(),
+            'total_active_alerts': sum(type_counts.values()),
         }
-        
+
         return render(request, self.template_name, context)
 
 
@@ -565,6 +638,17 @@ class CostAllocationView(View):
     template_name = "netbox_licenses/cost_allocation.html"
 
     def get(self, request):
+        return render(request, self.template_name, self.get_report_context(request))
+
+    @cached_report(
+        'cost_allocation',
+        models.License,
+        models.LicenseInstance,
+        models.ExchangeRate,
+        models.CostAllocation,
+        models.ChargebackEntry
+    )
+    def get_report_context(self, request):
         from decimal import Decimal
         from collections import defaultdict
 
@@ -698,7 +782,7 @@ class CostAllocationView(View):
             'optimization_recommendations': optimization_recommendations,
         }
 
-        return render(request, self.template_name, context)
+        return context
 
 
 class LicenseRenewalView(View):
@@ -706,14 +790,16 @@ class LicenseRenewalView(View):
     template_name = "netbox_licenses/license_renewals.html"
 
     def get(self, request):
+        return render(request, self.template_name, self.get_report_context(request))
+
+    @cached_report('license_renewals', models.License, models.LicenseInstance, models.LicenseRenewal)
+    def get_report_context(self, request):
         from datetime import datetime, timedelta
 
         # Get all instances with end dates
         instances_with_dates = models.LicenseInstance.objects.filter(
             end_date__isnull=False
-        ).select_related('license', 'license__vendor').prefetch_related(
-            'assigned_object_type', 'assigned_object'
-        )
+        ).select_related('license', 'license__vendor')
 
         today = datetime.now().date()
 
@@ -780,7 +866,7 @@ class LicenseRenewalView(View):
             'summary': summary,
         }
 
-        return render(request, self.template_name, context)
+        return context
 
 
 # Import webhook views from webhooks.py
@@ -4,7 +4,12 @@ setup(
     name='netbox_licenses',
     version='0.1',
     description='Manage licenses in NetBox',
-    install_requires=[],
+    install_requires=[
+        'numpy',
+    ],
+    extras_require={
+        'parquet': ['pyarrow'],
+    },
     packages=find_packages(),
     include_package_data=True,
     zip_safe=False,